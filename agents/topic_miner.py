@@ -13,7 +13,9 @@ from __future__ import annotations
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 from uuid import UUID
 
 import anthropic
@@ -23,7 +25,9 @@ import psycopg2.extras
 from dotenv import load_dotenv
 from langsmith import traceable
 from pgvector.psycopg2 import register_vector
-from sentence_transformers import SentenceTransformer
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 load_dotenv()
 
@@ -44,6 +48,8 @@ SIMILARITY_THRESHOLD = 0.75
 
 INPUT_COST_PER_TOK = 3.0 / 1_000_000   # $3 por MTok input
 OUTPUT_COST_PER_TOK = 15.0 / 1_000_000  # $15 por MTok output
+CACHE_WRITE_COST_PER_TOK = 3.75 / 1_000_000  # $3.75 por MTok (escrita no prompt cache)
+CACHE_READ_COST_PER_TOK = 0.30 / 1_000_000   # $0.30 por MTok (leitura do prompt cache)
 
 # Caminho para o modelo do ranker (opcional — integração silenciosa)
 _RANKER_PATH = Path(__file__).parent.parent / "models" / "ranker.pkl"
@@ -56,6 +62,9 @@ _embedder: SentenceTransformer | None = None
 def _get_embedder() -> SentenceTransformer:
     global _embedder
     if _embedder is None:
+        # Import lazy: sentence_transformers puxa torch/transformers (~1-3s, ~500MB RSS)
+        from sentence_transformers import SentenceTransformer  # noqa: PLC0415
+
         log.info("Carregando modelo all-MiniLM-L6-v2 (CPU)...")
         _embedder = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
     return _embedder
@@ -98,7 +107,7 @@ def _max_similarity(
     with conn.cursor() as cur:
         cur.execute(
             """
-            SELECT MAX(1.0 - (embedding <=> %s)) AS max_sim
+            SELECT MAX(1.0 - (embedding <=> %s::halfvec(384))) AS max_sim
             FROM (
                 SELECT embedding
                 FROM   topics
@@ -130,7 +139,7 @@ def _insert_topic(
             """
             INSERT INTO topics
                 (channel_id, title, rationale, source_urls, status, embedding, similarity_score)
-            VALUES (%s, %s, %s, %s, 'pending', %s, %s)
+            VALUES (%s, %s, %s, %s, 'pending', %s::halfvec(384), %s)
             RETURNING id
             """,
             (
@@ -145,6 +154,30 @@ def _insert_topic(
         return str(cur.fetchone()[0])
 
 
+def _cache_tokens(response: anthropic.types.Message | None) -> tuple[int, int]:
+    """Retorna (cache_read, cache_creation) input tokens; 0 quando ausentes."""
+    if response is None:
+        return 0, 0
+    usage = response.usage
+    return (
+        getattr(usage, "cache_read_input_tokens", None) or 0,
+        getattr(usage, "cache_creation_input_tokens", None) or 0,
+    )
+
+
+def _estimate_cost(response: anthropic.types.Message | None) -> float:
+    """Custo estimado em USD, separando tokens lidos/escritos no prompt cache."""
+    if response is None:
+        return 0.0
+    cache_read, cache_write = _cache_tokens(response)
+    return (
+        response.usage.input_tokens * INPUT_COST_PER_TOK
+        + cache_write * CACHE_WRITE_COST_PER_TOK
+        + cache_read * CACHE_READ_COST_PER_TOK
+        + response.usage.output_tokens * OUTPUT_COST_PER_TOK
+    )
+
+
 def _record_agent_run(
     conn: psycopg2.extensions.connection,
     channel_id: UUID,
@@ -156,7 +189,8 @@ def _record_agent_run(
 ) -> None:
     tokens_input = response.usage.input_tokens if response else 0
     tokens_output = response.usage.output_tokens if response else 0
-    cost_usd = tokens_input * INPUT_COST_PER_TOK + tokens_output * OUTPUT_COST_PER_TOK
+    cache_read, cache_write = _cache_tokens(response)
+    cost_usd = _estimate_cost(response)
 
     with conn.cursor() as cur:
         cur.execute(
@@ -177,6 +211,8 @@ def _record_agent_run(
                         "saved": len(saved),
                         "rejected": CANDIDATE_COUNT - len(saved),
                         "topics": saved,
+                        "cache_read_input_tokens": cache_read,
+                        "cache_creation_input_tokens": cache_write,
                     }
                 ),
                 tokens_input,
@@ -191,72 +227,90 @@ def _record_agent_run(
 # ── Claude API ─────────────────────────────────────────────────────────────────
 
 
+# Schema e prompts estáticos — montados uma vez no import, reutilizados a cada chamada.
+
+_SYSTEM_TEMPLATE = (
+    "Você é um estrategista de conteúdo para o canal YouTube '{channel_name}'.\n"
+    "Nicho: {niche}\n"
+    "Tom: {tone}\n"
+    "Público-alvo: {target_audience}\n\n"
+    "Gere tópicos com fatos científicos verificáveis, dados surpreendentes ou contraintuitivos. "
+    "Cada tópico deve ter potencial para um gancho de plot twist que prenda a atenção "
+    "nos primeiros 30 segundos do vídeo."
+)
+
+_USER_PROMPT = (
+    f"Gere exatamente {CANDIDATE_COUNT} candidatos de tópico para vídeos do YouTube. "
+    "Foco em curiosidades científicas verificáveis com dados contraintuitivos ou surpreendentes. "
+    "Todos os títulos devem estar em português do Brasil (pt-BR). "
+    "Para cada tópico, forneça um título envolvente e uma justificativa (rationale) "
+    "explicando o potencial de engajamento e o ângulo contraintuitivo."
+)
+
+_TOOLS_SCHEMA: list[dict] = [
+    {
+        "name": "submit_topics",
+        "description": "Submete a lista de candidatos de tópico gerados",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "topics": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "title": {
+                                "type": "string",
+                                "description": "Título do tópico em pt-BR",
+                            },
+                            "rationale": {
+                                "type": "string",
+                                "description": "Por que esse tópico tem potencial de engajamento",
+                            },
+                            "source_urls": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": (
+                                    "URLs de fontes reais e conhecidas que embasam o tópico "
+                                    "(ex: https://arxiv.org/..., https://nature.com/...). "
+                                    "Deixe vazio se não souber com certeza — nunca invente."
+                                ),
+                            },
+                        },
+                        "required": ["title", "rationale", "source_urls"],
+                    },
+                    "minItems": CANDIDATE_COUNT,
+                    "maxItems": CANDIDATE_COUNT,
+                }
+            },
+            "required": ["topics"],
+        },
+    }
+]
+
+_TOOL_CHOICE = {"type": "tool", "name": "submit_topics"}
+
+
 def _call_claude(
     client: anthropic.Anthropic, channel: dict
 ) -> anthropic.types.Message:
-    system = (
-        f"Você é um estrategista de conteúdo para o canal YouTube '{channel['channel_name']}'.\n"
-        f"Nicho: {channel['niche']}\n"
-        f"Tom: {channel['tone']}\n"
-        f"Público-alvo: {channel['target_audience']}\n\n"
-        "Gere tópicos com fatos científicos verificáveis, dados surpreendentes ou contraintuitivos. "
-        "Cada tópico deve ter potencial para um gancho de plot twist que prenda a atenção "
-        "nos primeiros 30 segundos do vídeo."
-    )
-    user = (
-        f"Gere exatamente {CANDIDATE_COUNT} candidatos de tópico para vídeos do YouTube. "
-        "Foco em curiosidades científicas verificáveis com dados contraintuitivos ou surpreendentes. "
-        "Todos os títulos devem estar em português do Brasil (pt-BR). "
-        "Para cada tópico, forneça um título envolvente e uma justificativa (rationale) "
-        "explicando o potencial de engajamento e o ângulo contraintuitivo."
-    )
-
     return client.messages.create(
         model=CLAUDE_MODEL,
         max_tokens=4096,
-        system=system,
-        tools=[
+        # Prompt caching: tools + system formam o prefixo cacheado (TTL ~5min).
+        # Abaixo do mínimo do modelo (1024 tokens no Sonnet) a API ignora o marcador
+        # sem erro — hoje o prefixo tem ~650 tokens, então cache_read/cache_creation
+        # em agent_runs ficam 0 até o prompt de sistema crescer (ex.: few-shots).
+        system=[
             {
-                "name": "submit_topics",
-                "description": "Submete a lista de candidatos de tópico gerados",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "topics": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "title": {
-                                        "type": "string",
-                                        "description": "Título do tópico em pt-BR",
-                                    },
-                                    "rationale": {
-                                        "type": "string",
-                                        "description": "Por que esse tópico tem potencial de engajamento",
-                                    },
-                                    "source_urls": {
-                                        "type": "array",
-                                        "items": {"type": "string"},
-                                        "description": (
-                                            "URLs de fontes reais e conhecidas que embasam o tópico "
-                                            "(ex: https://arxiv.org/..., https://nature.com/...). "
-                                            "Deixe vazio se não souber com certeza — nunca invente."
-                                        ),
-                                    },
-                                },
-                                "required": ["title", "rationale", "source_urls"],
-                            },
-                            "minItems": CANDIDATE_COUNT,
-                            "maxItems": CANDIDATE_COUNT,
-                        }
-                    },
-                    "required": ["topics"],
-                },
+                "type": "text",
+                "text": _SYSTEM_TEMPLATE.format_map(channel),
+                "cache_control": {"type": "ephemeral"},
             }
         ],
-        tool_choice={"type": "tool", "name": "submit_topics"},
-        messages=[{"role": "user", "content": user}],
+        tools=_TOOLS_SCHEMA,
+        tool_choice=_TOOL_CHOICE,
+        messages=[{"role": "user", "content": _USER_PROMPT}],
     )
 
 
@@ -316,6 +370,11 @@ def mine_topics(channel_id: UUID) -> list[dict]:
     conn = _get_conn()
 
     try:
+        # Carrega o embedder em background: a carga (1-3s a frio) fica escondida
+        # atrás da latência da chamada ao Claude, que não compartilha dados com ela.
+        preload = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedder")
+        embedder_future = preload.submit(_get_embedder)
+
         # 1. Contexto do canal
         channel = _fetch_channel(conn, channel_id)
         log.info("Minerando tópicos para canal '%s'...", channel["channel_name"])
@@ -324,26 +383,33 @@ def mine_topics(channel_id: UUID) -> list[dict]:
         log.info("Chamando %s...", CLAUDE_MODEL)
         response = _call_claude(client, channel)
         candidates = _parse_candidates(response)
+        cache_read, cache_write = _cache_tokens(response)
         log.info(
-            "Claude gerou %d candidatos  (%d tokens in / %d tokens out)",
+            "Claude gerou %d candidatos  (%d tokens in / %d tokens out | cache %d read / %d write)",
             len(candidates),
             response.usage.input_tokens,
             response.usage.output_tokens,
+            cache_read,
+            cache_write,
         )
 
         # 3. Reordenação por ranker (opcional — fallback silencioso se modelo ausente)
         candidates = _rank_candidates(candidates)
 
         # 4. Embeddings + deduplicação + persistência
-        embedder = _get_embedder()
+        embedder = embedder_future.result()
         saved: list[dict] = []
+        max_sims: list[float | None] = []
+        debug = log.isEnabledFor(logging.DEBUG)
 
         for candidate in candidates:
             emb: np.ndarray = embedder.encode(candidate["title"])
             max_sim = _max_similarity(conn, channel_id, emb)
+            max_sims.append(max_sim)
 
             if max_sim is not None and max_sim > SIMILARITY_THRESHOLD:
-                log.info("  ✗ Rejeitado (sim=%.3f): %s", max_sim, candidate["title"])
+                if debug:
+                    log.debug("  ✗ Rejeitado (sim=%.3f): %s", max_sim, candidate["title"])
                 continue
 
             topic_id = _insert_topic(conn, channel_id, candidate, emb, max_sim)
@@ -354,16 +420,20 @@ def mine_topics(channel_id: UUID) -> list[dict]:
                     "similarity_score": max_sim,
                 }
             )
-            log.info("  ✓ Salvo: %s", candidate["title"])
+            if debug:
+                log.debug("  ✓ Salvo: %s", candidate["title"])
 
+        log.info(
+            "dedup: %d mantidos, %d rejeitados; max_sims=%s",
+            len(saved),
+            len(candidates) - len(saved),
+            [round(s, 3) if s is not None else None for s in max_sims],
+        )
         conn.commit()
 
         # 5. Registra execução em agent_runs
         duration_ms = int((time.monotonic() - t0) * 1000)
-        cost_usd = (
-            response.usage.input_tokens * INPUT_COST_PER_TOK
-            + response.usage.output_tokens * OUTPUT_COST_PER_TOK
-        )
+        cost_usd = _estimate_cost(response)
         _record_agent_run(conn, channel_id, response, saved, duration_ms, "success")
         conn.commit()
 
@@ -388,6 +458,7 @@ def mine_topics(channel_id: UUID) -> list[dict]:
         raise
 
     finally:
+        preload.shutdown(wait=False)
         conn.close()
 
 
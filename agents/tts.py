@@ -17,7 +17,7 @@ from pathlib import Path
 # (deve vir ANTES dos imports third-party pois `from models import ...` é module-level)
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
+import asyncio
 import logging
 import os
 import time
@@ -44,6 +44,8 @@ log = logging.getLogger(__name__)
 AGENT_NAME = "tts"
 TTS_VOICE = os.getenv("EDGE_TTS_VOICE", "pt-BR-AntonioNeural")
 TTS_RATE = os.getenv("EDGE_TTS_RATE", "+20%")
+# Segmentos sintetizados em paralelo (cada um é uma sessão WebSocket com o Edge-TTS)
+TTS_MAX_CONCURRENCY = int(os.getenv("EDGE_TTS_MAX_CONCURRENCY", "4"))
 OUTPUT_BASE = Path("output") / "audio"
 
 # ── Helpers de banco ───────────────────────────────────────────────────────────
@@ -118,19 +120,17 @@ def _record_agent_run(
 def _build_segments(script: dict) -> dict[str, str]:
     """Constrói o dict {beat_id: texto} a partir da linha do banco.
 
-    Beats JSONB: lista de {"fact": ..., "analogy": ...}
+    Beats JSONB: lista de {"fact": ..., "analogy": ...} — psycopg2 já decodifica
+    JSONB para list, sem necessidade de json.loads.
     Omite o segmento 'cta' se for NULL ou vazio.
     """
-    beats_raw = script["beats"]
-    if isinstance(beats_raw, str):
-        beats_raw = json.loads(beats_raw)
-
-    segments: dict[str, str] = {}
-    segments["hook"] = script["hook"]
-
-    for i, beat in enumerate(beats_raw, start=1):
-        segments[f"beat_{i}"] = f"{beat['fact']} {beat['analogy']}"
-
+    segments: dict[str, str] = {"hook": script["hook"]}
+    segments.update(
+        {
+            f"beat_{i}": f"{beat['fact']} {beat['analogy']}"
+            for i, beat in enumerate(script["beats"], start=1)
+        }
+    )
     segments["payoff"] = script["payoff"]
 
     cta = script.get("cta") or ""
@@ -143,20 +143,42 @@ def _build_segments(script: dict) -> dict[str, str]:
 # ── Geração de áudio ───────────────────────────────────────────────────────────
 
 
-def _generate_segment(text: str, output_path: Path) -> float:
+async def _generate_segment(text: str, output_path: Path) -> float:
     """Gera .mp3 para um segmento e retorna a duração em segundos."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
     communicate = edge_tts.Communicate(text, TTS_VOICE, rate=TTS_RATE)
-    communicate.save_sync(str(output_path))
+    await communicate.save(str(output_path))
     audio = MP3(str(output_path))
     return round(audio.info.length, 3)
 
 
+async def _generate_segments(video_id: UUID, segments: dict[str, str]) -> dict[str, float]:
+    """Sintetiza todos os segmentos concorrentemente (até TTS_MAX_CONCURRENCY por vez).
+
+    TTS é I/O-bound: o tempo total fica próximo do segmento mais lento, não da soma.
+    Retorna {beat_id: duration_sec} na ordem de `segments`.
+    """
+    sem = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+
+    async def _one(beat_id: str, text: str) -> float:
+        out_path = OUTPUT_BASE / str(video_id) / f"{beat_id}.mp3"
+        async with sem:
+            log.info("  [%s] %d chars → %s", beat_id, len(text), out_path)
+            duration = await _generate_segment(text, out_path)
+        log.info("  [%s] %.2fs", beat_id, duration)
+        return duration
+
+    results = await asyncio.gather(
+        *(_one(beat_id, text) for beat_id, text in segments.items())
+    )
+    return dict(zip(segments, results))
+
+
 # ── Agente principal ───────────────────────────────────────────────────────────
 
 
 @traceable(name=AGENT_NAME)
-def generate_audio(video_id: UUID) -> dict[str, float]:
+async def generate_audio_async(video_id: UUID) -> dict[str, float]:
     """Gera arquivos .mp3 para cada segmento do script do vídeo.
 
     Args:
@@ -177,12 +199,7 @@ def generate_audio(video_id: UUID) -> dict[str, float]:
         segments_list = list(segments.keys())
         log.info("Gerando áudio para vídeo %s — %d segmentos", str(video_id)[:8], len(segments))
 
-        for beat_id, text in segments.items():
-            out_path = OUTPUT_BASE / str(video_id) / f"{beat_id}.mp3"
-            log.info("  [%s] %d chars → %s", beat_id, len(text), out_path)
-            duration = _generate_segment(text, out_path)
-            durations[beat_id] = duration
-            log.info("    %.2fs", duration)
+        durations = await _generate_segments(video_id, segments)
 
         duration_ms = int((time.monotonic() - t0) * 1000)
         total_sec = round(sum(durations.values()), 2)
@@ -217,6 +234,11 @@ def generate_audio(video_id: UUID) -> dict[str, float]:
         conn.close()
 
 
+def generate_audio(video_id: UUID) -> dict[str, float]:
+    """Versão síncrona de generate_audio_async (roda o event loop próprio)."""
+    return asyncio.run(generate_audio_async(video_id))
+
+
 # ── Execução manual ────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
@@ -0,0 +1,28 @@
+-- =============================================================
+-- 005_topics_embedding_halfvec.sql
+-- Apogee Engine — armazena topics.embedding em fp16 (halfvec)
+-- Criado: 2026-10-15
+-- Requer: pgvector >= 0.7.0
+-- Rollback: DROP INDEX IF EXISTS idx_topics_embedding;
+--           ALTER TABLE topics ALTER COLUMN embedding TYPE VECTOR(384)
+--               USING embedding::vector(384);
+--           CREATE INDEX idx_topics_embedding ON topics
+--               USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- =============================================================
+
+-- MiniLM gera embeddings normalizados: fp16 reduz pela metade o armazenamento
+-- e os bytes lidos por consulta de similaridade, com perda de recall desprezível.
+-- Idempotente: só converte se a coluna ainda for VECTOR.
+DO $$
+BEGIN
+    IF (SELECT format_type(atttypid, atttypmod)
+        FROM   pg_attribute
+        WHERE  attrelid = 'topics'::regclass AND attname = 'embedding') = 'vector(384)' THEN
+        DROP INDEX IF EXISTS idx_topics_embedding;
+        ALTER TABLE topics
+            ALTER COLUMN embedding TYPE HALFVEC(384) USING embedding::halfvec(384);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_topics_embedding
+    ON topics USING hnsw (embedding halfvec_cosine_ops);
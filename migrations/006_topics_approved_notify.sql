@@ -0,0 +1,23 @@
+-- =============================================================
+-- 006_topics_approved_notify.sql
+-- Apogee Engine — NOTIFY topic_approved quando um tópico é aprovado
+-- Criado: 2026-10-15
+-- Rollback: DROP TRIGGER IF EXISTS trg_topics_notify_approved ON topics;
+--           DROP FUNCTION IF EXISTS notify_topic_approved();
+-- =============================================================
+
+-- O orquestrador (pipeline.py) faz LISTEN topic_approved em vez de consultar
+-- a tabela periodicamente. Payload: id do tópico (UUID em texto).
+CREATE OR REPLACE FUNCTION notify_topic_approved() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('topic_approved', NEW.id::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_topics_notify_approved ON topics;
+CREATE TRIGGER trg_topics_notify_approved
+    AFTER UPDATE OF status ON topics
+    FOR EACH ROW
+    WHEN (NEW.status = 'approved' AND OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_topic_approved();
@@ -61,6 +61,19 @@ class ScriptBeat(BaseModel):
 # ── Script ─────────────────────────────────────────────────────────────────────
 
 
+def _compose_full_text(
+    hook: str, beats: list[ScriptBeat], payoff: str, cta: str | None
+) -> str:
+    parts = [hook]
+    for beat in beats:
+        parts.append(beat.fact)
+        parts.append(beat.analogy)
+    parts.append(payoff)
+    if cta:
+        parts.append(cta)
+    return "\n\n".join(parts)
+
+
 class Script(BaseModel):
     hook: Annotated[str, Field(max_length=200)]
     beats: Annotated[list[ScriptBeat], Field(min_length=3, max_length=3)]
@@ -70,14 +83,7 @@ class Script(BaseModel):
 
     @model_validator(mode="after")
     def build_full_text(self) -> Script:
-        parts = [self.hook]
-        for beat in self.beats:
-            parts.append(beat.fact)
-            parts.append(beat.analogy)
-        parts.append(self.payoff)
-        if self.cta:
-            parts.append(self.cta)
-        self.full_text = "\n\n".join(parts)
+        self.full_text = _compose_full_text(self.hook, self.beats, self.payoff, self.cta)
         return self
 
 
@@ -105,6 +111,54 @@ class VideoSpec(BaseModel):
     template_score: Optional[Annotated[float, Field(ge=0.0, le=1.0)]] = None
     created_at: Optional[datetime] = None
 
+    @classmethod
+    def from_db_rows(cls, v_row: dict, s_row: dict, c_rows: list[dict]) -> VideoSpec:
+        """Reconstrói VideoSpec a partir de linhas já validadas na escrita.
+
+        Usa model_construct (sem validação) — só para dados confiáveis vindos do banco.
+
+        Args:
+            v_row:  linha de videos com id, channel_id, topic_id, title, status, created_at
+            s_row:  linha de scripts com hook, beats, payoff, cta,
+                    template_score, similarity_score
+            c_rows: linhas de claims com claim_text, source_url, risk_score, verified
+        """
+        beats = [
+            ScriptBeat.model_construct(fact=b["fact"], analogy=b["analogy"])
+            for b in s_row["beats"]
+        ]
+        cta = s_row["cta"] or None
+        script = Script.model_construct(
+            hook=s_row["hook"],
+            beats=beats,
+            payoff=s_row["payoff"],
+            cta=cta,
+            full_text=_compose_full_text(s_row["hook"], beats, s_row["payoff"], cta),
+        )
+        claims = [
+            Claim.model_construct(
+                claim_text=c["claim_text"],
+                source_url=c["source_url"],
+                confidence=round(1.0 - float(c["risk_score"]), 6),
+                verified=bool(c["verified"]),
+            )
+            for c in c_rows
+        ]
+        similarity = s_row["similarity_score"]
+        template = s_row["template_score"]
+        return cls.model_construct(
+            video_id=UUID(str(v_row["id"])),
+            topic_id=UUID(str(v_row["topic_id"])),
+            topic_title=v_row["title"],
+            channel_id=UUID(str(v_row["channel_id"])),
+            status=VideoStatus(v_row["status"]),
+            claims=claims,
+            script=script,
+            similarity_score=float(similarity) if similarity is not None else None,
+            template_score=float(template) if template is not None else None,
+            created_at=v_row["created_at"],
+        )
+
     def to_db_rows(self) -> dict:
         """Retorna dicionário com linhas prontas para inserção no banco.
 
@@ -11,25 +11,33 @@ Uso manual:
 from __future__ import annotations
 
 import argparse
+import atexit
 import json
 import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import AbstractContextManager
 from datetime import datetime, timezone
 from pathlib import Path
 from uuid import UUID
 
-import psycopg2
-import psycopg2.extras
+import orjson
+import psycopg
+import psycopg_pool
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
-from redis import Redis
-from rq import Queue
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb, set_json_dumps
+from redis import BlockingConnectionPool, Redis
+from rq import Callback, Queue
 from rq.job import Job, JobStatus
 
-from models import Claim, FactCheckResult, Script, ScriptBeat, VideoSpec, VideoStatus
+from models import FactCheckResult, VideoSpec
 from scripts.alerting import daily_summary, rotate_logs, send_alert
+from workers.callbacks import done_key, on_failure, on_success
 
 load_dotenv()
 
@@ -45,32 +53,95 @@ log = logging.getLogger(__name__)
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 PIPELINE_SCHEDULE = os.getenv("PIPELINE_SCHEDULE", "0 8 * * *")
 APPROVAL_TIMEOUT_HOURS = int(os.getenv("APPROVAL_TIMEOUT_HOURS", "48"))
-APPROVAL_POLL_INTERVAL_S = int(os.getenv("APPROVAL_POLL_INTERVAL_S", "60"))
 TEMPLATE_SCORE_POLL_S = int(os.getenv("TEMPLATE_SCORE_POLL_S", "30"))
+MAX_PARALLEL_TOPICS = int(os.getenv("MAX_PARALLEL_TOPICS", "8"))
+# Pico de conexões simultâneas: uma por thread de tópico (reutilizada também no
+# template_score) + a do run_pipeline + a das tarefas diárias, que o scheduler
+# pode disparar enquanto o pipeline aguarda aprovações.
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", str(MAX_PARALLEL_TOPICS + 2)))
+# Cada thread de tópico segura uma conexão Redis no BLPOP; + a thread principal
+# e folga para enqueues/leituras de job concorrentes.
+REDIS_POOL_MAX_SIZE = int(os.getenv("REDIS_POOL_MAX_SIZE", str(MAX_PARALLEL_TOPICS + 4)))
+REDIS_POOL_TIMEOUT_S = int(os.getenv("REDIS_POOL_TIMEOUT_S", "30"))
 
 ROOT = Path(__file__).parent
 STORYBOARD_BASE = ROOT / "output" / "storyboards"
 
 MAX_FACT_CHECK_ATTEMPTS = 2  # máximo de tentativas scriptwriter+factchecker por vídeo
 
+APPROVAL_CHANNEL = "topic_approved"  # canal NOTIFY (migrations/006_topics_approved_notify.sql)
+APPROVAL_HEARTBEAT_S = 3600  # log de progresso + reconsulta de segurança enquanto aguarda
+# Os callbacks do RQ rodam antes de o Result ser gravado: re-polls curtos até ele aparecer
+JOB_RESULT_BACKOFF_S = (0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
 # ── Conexões ───────────────────────────────────────────────────────────────────
 
 
-def _get_conn() -> psycopg2.extensions.connection:
-    db_url = os.getenv("SUPABASE_DB_URL")
-    if not db_url:
-        raise RuntimeError("SUPABASE_DB_URL não definido no .env")
-    return psycopg2.connect(db_url, connect_timeout=10)
+# Pool Postgres do processo: sob o scheduler, cada execução reaproveita
+# conexões já abertas em vez de pagar TCP+TLS+startup a cada disparo.
+# Criado no primeiro uso (importar o módulo não conecta).
+_PG_POOL: psycopg_pool.ConnectionPool | None = None
+_PG_POOL_LOCK = threading.Lock()
+
+
+def _configure_conn(conn: psycopg.Connection) -> None:
+    # Jsonb serializado pelo orjson (C) em vez de json.dumps; só nesta conexão.
+    set_json_dumps(orjson.dumps, conn)
+
+
+def _get_pool() -> psycopg_pool.ConnectionPool:
+    global _PG_POOL
+    if _PG_POOL is not None:
+        return _PG_POOL
+    with _PG_POOL_LOCK:
+        if _PG_POOL is None:
+            db_url = os.getenv("SUPABASE_DB_URL")
+            if not db_url:
+                raise RuntimeError("SUPABASE_DB_URL não definido no .env")
+            pool = psycopg_pool.ConnectionPool(
+                db_url,
+                min_size=1,
+                max_size=DB_POOL_MAX_SIZE,
+                # prepare_threshold: statements repetidos viram prepared statements no servidor
+                kwargs={"connect_timeout": 10, "prepare_threshold": 5},
+                configure=_configure_conn,
+                # Conexões ociosas entre disparos do cron podem ter caído no servidor
+                check=psycopg_pool.ConnectionPool.check_connection,
+                name="apogee",
+                open=True,
+            )
+            atexit.register(pool.close)
+            _PG_POOL = pool
+    return _PG_POOL
+
+
+def _get_conn() -> AbstractContextManager[psycopg.Connection]:
+    """Empresta uma conexão do pool; devolvida (commit/rollback) ao sair do with."""
+    return _get_pool().connection()
+
 
+# Um pool Redis por processo, compartilhado por todas as filas — evita abrir
+# uma conexão (e handshake TLS em Redis gerenciado) por fila/tópico.
+# O RQ (>=1.16) memoiza a versão do servidor (INFO server) no objeto Redis e
+# na Queue; reutilizar os mesmos objetos faz o INFO acontecer uma vez por
+# processo em vez de a cada enqueue.
+# Pool bloqueante: esgotado, espera até REDIS_POOL_TIMEOUT_S por uma conexão
+# livre em vez de falhar na hora com "Too many connections".
+_REDIS_POOL = BlockingConnectionPool.from_url(
+    REDIS_URL, max_connections=REDIS_POOL_MAX_SIZE, timeout=REDIS_POOL_TIMEOUT_S
+)
+_REDIS = Redis(connection_pool=_REDIS_POOL)
 
-def _get_redis() -> Redis:
-    return Redis.from_url(REDIS_URL)
+_QUEUES: dict[str, Queue] = {
+    name: Queue(name, connection=_REDIS)
+    for name in ("topic_miner", "researcher", "scriptwriter", "fact_checker")
+}
 
 
 # ── Helpers de banco ───────────────────────────────────────────────────────────
 
 
-def _fetch_channel_id(conn: psycopg2.extensions.connection) -> UUID:
+def _fetch_channel_id(conn: psycopg.Connection) -> UUID:
     """Retorna o UUID do primeiro canal em channel_config."""
     with conn.cursor() as cur:
         cur.execute("SELECT id FROM channel_config ORDER BY created_at ASC LIMIT 1")
@@ -81,11 +152,16 @@ def _fetch_channel_id(conn: psycopg2.extensions.connection) -> UUID:
 
 
 def _fetch_approved_topic_ids(
-    conn: psycopg2.extensions.connection,
+    conn: psycopg.Connection,
     channel_id: UUID,
     candidate_ids: list[UUID],
 ) -> list[UUID]:
-    """Retorna IDs dos tópicos candidatos com status='approved'."""
+    """Retorna IDs dos tópicos candidatos com status='approved'.
+
+    Executada a cada NOTIFY/heartbeat da espera por aprovação: prepare=True
+    faz o psycopg emitir PREPARE já na primeira chamada (sem esperar o
+    prepare_threshold) e reutilizar o plano via EXECUTE nas seguintes.
+    """
     if not candidate_ids:
         return []
     with conn.cursor() as cur:
@@ -96,13 +172,14 @@ def _fetch_approved_topic_ids(
               AND  status = 'approved'
               AND  id = ANY(%s)
             """,
-            (str(channel_id), [str(tid) for tid in candidate_ids]),
+            (channel_id, list(candidate_ids)),
+            prepare=True,
         )
         return [UUID(str(row[0])) for row in cur.fetchall()]
 
 
 def _fetch_video_id(
-    conn: psycopg2.extensions.connection, topic_id: UUID
+    conn: psycopg.Connection, topic_id: UUID
 ) -> UUID | None:
     """Retorna o UUID do vídeo draft vinculado ao tópico, ou None se não existir."""
     with conn.cursor() as cur:
@@ -115,7 +192,7 @@ def _fetch_video_id(
 
 
 def _mark_video_failed(
-    conn: psycopg2.extensions.connection, video_id: UUID, reason: str
+    conn: psycopg.Connection, video_id: UUID, reason: str
 ) -> None:
     with conn.cursor() as cur:
         cur.execute(
@@ -131,7 +208,7 @@ def _mark_video_failed(
 
 
 def _record_orchestrator_run(
-    conn: psycopg2.extensions.connection,
+    conn: psycopg.Connection,
     channel_id: UUID,
     status: str,
     topics_processed: int,
@@ -151,10 +228,10 @@ def _record_orchestrator_run(
             """,
             (
                 status,
-                psycopg2.extras.Json(
+                Jsonb(
                     {"channel_id": str(channel_id), "topics_processed": topics_processed}
                 ),
-                psycopg2.extras.Json(
+                Jsonb(
                     {"videos_approved": videos_approved, "videos_failed": videos_failed}
                 ),
                 duration_ms,
@@ -165,16 +242,29 @@ def _record_orchestrator_run(
 
 
 def _build_video_spec(
-    conn: psycopg2.extensions.connection, video_id: UUID
+    conn: psycopg.Connection, video_id: UUID
 ) -> VideoSpec:
-    """Reconstrói VideoSpec a partir do banco de dados."""
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+    """Reconstrói VideoSpec a partir do banco de dados.
+
+    Script e claims vêm numa única consulta (claims agregados via jsonb_agg).
+    """
+    with conn.cursor(row_factory=dict_row) as cur:
         cur.execute(
             """
             SELECT v.id, v.channel_id, v.topic_id, t.title,
                    v.status, v.created_at,
                    s.hook, s.beats, s.payoff, s.cta,
-                   s.template_score, s.similarity_score
+                   s.template_score, s.similarity_score,
+                   COALESCE(
+                       (SELECT jsonb_agg(jsonb_build_object(
+                                   'claim_text', c.claim_text,
+                                   'source_url', c.source_url,
+                                   'risk_score', c.risk_score,
+                                   'verified',   c.verified))
+                        FROM   claims c
+                        WHERE  c.video_id = v.id),
+                       '[]'::jsonb
+                   ) AS claims
             FROM   videos v
             JOIN   topics  t ON t.id = v.topic_id
             JOIN   scripts s ON s.video_id = v.id
@@ -182,55 +272,18 @@ def _build_video_spec(
             ORDER  BY s.created_at DESC
             LIMIT  1
             """,
-            (str(video_id),),
+            (video_id,),
         )
-        row = dict(cur.fetchone())
-
-        cur.execute(
-            "SELECT claim_text, source_url, risk_score, verified FROM claims WHERE video_id = %s",
-            (str(video_id),),
-        )
-        claim_rows = cur.fetchall()
-
-    beats_raw = row["beats"] if isinstance(row["beats"], list) else json.loads(row["beats"])
-    beats = [ScriptBeat(fact=b["fact"], analogy=b["analogy"]) for b in beats_raw]
-
-    script = Script(
-        hook=row["hook"],
-        beats=beats,
-        payoff=row["payoff"],
-        cta=row["cta"] or None,
-    )
+        row = cur.fetchone()
 
-    claims = [
-        Claim(
-            claim_text=r["claim_text"],
-            source_url=r["source_url"],
-            confidence=round(1.0 - float(r["risk_score"]), 6),
-            verified=bool(r["verified"]),
-        )
-        for r in claim_rows
-    ]
-
-    return VideoSpec(
-        video_id=UUID(str(row["id"])),
-        topic_id=UUID(str(row["topic_id"])),
-        topic_title=row["title"],
-        channel_id=UUID(str(row["channel_id"])),
-        status=VideoStatus(row["status"]),
-        claims=claims,
-        script=script,
-        similarity_score=float(row["similarity_score"]) if row["similarity_score"] is not None else None,
-        template_score=float(row["template_score"]) if row["template_score"] is not None else None,
-        created_at=row["created_at"],
-    )
+    return VideoSpec.from_db_rows(row, row, row["claims"])
 
 
 # ── template_score ─────────────────────────────────────────────────────────────
 
 
 def _fetch_script_similarity(
-    conn: psycopg2.extensions.connection, video_id: UUID
+    conn: psycopg.Connection, video_id: UUID
 ) -> float:
     """Retorna similarity_score do script mais recente do vídeo (0.0 se NULL)."""
     with conn.cursor() as cur:
@@ -251,7 +304,7 @@ def _fetch_script_similarity(
 
 
 def _calc_scene_reuse_rate(
-    conn: psycopg2.extensions.connection, video_id: UUID
+    conn: psycopg.Connection, video_id: UUID
 ) -> float:
     """Calcula % de vídeos recentes com conjunto de tipos de cena idêntico ao atual.
 
@@ -305,7 +358,7 @@ def _calc_scene_reuse_rate(
 
 
 def _persist_template_score(
-    conn: psycopg2.extensions.connection, video_id: UUID, template_score: float
+    conn: psycopg.Connection, video_id: UUID, template_score: float
 ) -> None:
     """Persiste template_score no script mais recente do vídeo."""
     with conn.cursor() as cur:
@@ -351,7 +404,34 @@ def _template_score_gate(video_id: UUID, template_score: float) -> None:
         time.sleep(TEMPLATE_SCORE_POLL_S)
 
 
-def calculate_template_score(video_id: UUID) -> float:
+def _compute_template_score(conn: psycopg.Connection, video_id: UUID) -> float:
+    """Calcula template_score e o persiste (com commit) na conexão recebida."""
+    script_similarity_max = _fetch_script_similarity(conn, video_id)
+    scene_reuse_rate = _calc_scene_reuse_rate(conn, video_id)
+    asset_reuse_rate = 0.0  # sem assets por enquanto
+
+    template_score = (
+        0.4 * scene_reuse_rate
+        + 0.4 * script_similarity_max
+        + 0.2 * asset_reuse_rate
+    )
+
+    log.info(
+        "[%s] template_score=%.3f  "
+        "(scene_reuse=%.3f  script_sim=%.3f  asset_reuse=%.3f)",
+        str(video_id)[:8],
+        template_score,
+        scene_reuse_rate,
+        script_similarity_max,
+        asset_reuse_rate,
+    )
+
+    _persist_template_score(conn, video_id, template_score)
+    conn.commit()
+    return template_score
+
+
+def calculate_template_score(video_id: UUID, conn: psycopg.Connection | None = None) -> float:
     """Calcula e persiste template_score antes do render.
 
     Fórmula:
@@ -363,69 +443,104 @@ def calculate_template_score(video_id: UUID) -> float:
 
     Args:
         video_id: UUID do vídeo.
+        conn: conexão já aberta do chamador (thread do tópico). Se omitida, usa
+            uma do pool, devolvida antes de entrar no gate de FORCE_RENDER.
 
     Returns:
         float: template_score calculado.
     """
-    conn = _get_conn()
-    try:
-        script_similarity_max = _fetch_script_similarity(conn, video_id)
-        scene_reuse_rate = _calc_scene_reuse_rate(conn, video_id)
-        asset_reuse_rate = 0.0  # sem assets por enquanto
-
-        template_score = (
-            0.4 * scene_reuse_rate
-            + 0.4 * script_similarity_max
-            + 0.2 * asset_reuse_rate
-        )
+    if conn is not None:
+        template_score = _compute_template_score(conn, video_id)
+    else:
+        with _get_conn() as pool_conn:
+            template_score = _compute_template_score(pool_conn, video_id)
 
-        log.info(
-            "[%s] template_score=%.3f  "
-            "(scene_reuse=%.3f  script_sim=%.3f  asset_reuse=%.3f)",
-            str(video_id)[:8],
-            template_score,
-            scene_reuse_rate,
-            script_similarity_max,
-            asset_reuse_rate,
-        )
+    if template_score > 0.70:
+        _template_score_gate(video_id, template_score)
 
-        _persist_template_score(conn, video_id, template_score)
-        conn.commit()
+    return template_score
 
-        if template_score > 0.70:
-            _template_score_gate(video_id, template_score)
 
-        return template_score
+# ── RQ helpers ─────────────────────────────────────────────────────────────────
 
-    finally:
-        conn.close()
+# Todos os jobs passam pelo dispatcher: run(<agente>, <id>)
+_DISPATCH = "workers.dispatcher.run"
 
 
-# ── RQ helpers ─────────────────────────────────────────────────────────────────
+def _enqueue(queue: Queue, func: str, *args: object, job_timeout: int) -> Job:
+    """Enfileira job com callbacks que sinalizam término via RPUSH (ver _wait_job)."""
+    return queue.enqueue(
+        func,
+        *args,
+        job_timeout=job_timeout,
+        on_success=Callback(on_success),
+        on_failure=Callback(on_failure),
+    )
+
+
+def _enqueue_many(
+    queue: Queue, func: str, args_list: list[tuple], job_timeout: int
+) -> list[Job]:
+    """Enfileira um job por tupla de args em um único round-trip (pipeline Redis)."""
+    return queue.enqueue_many(
+        [
+            Queue.prepare_data(
+                func,
+                args,
+                timeout=job_timeout,
+                on_success=Callback(on_success),
+                on_failure=Callback(on_failure),
+            )
+            for args in args_list
+        ]
+    )
+
 
+def _wait_job(job: Job, name: str) -> bytes:
+    """Aguarda conclusão do job RQ e retorna o payload JSON (bytes), ou lança RuntimeError.
 
-def _wait_job(job: Job, name: str, poll_s: float = 1.0) -> object:
-    """Aguarda conclusão do job RQ e retorna o resultado, ou lança RuntimeError."""
+    Os workers devolvem o resultado já serializado com orjson; quem chama
+    decodifica (orjson.loads / model_validate_json).
+
+    Bloqueia em BLPOP na chave de término escrita pelos callbacks do worker.
+    A cada `job.timeout` sem sinal, confere o status uma vez — cobre jobs ainda
+    na fila e workers que morreram sem executar o callback.
+    """
     terminal = {JobStatus.FINISHED, JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED}
-    while job.get_status() not in terminal:
-        time.sleep(poll_s)
+    key = done_key(job.id)
+    block_s = int(job.timeout or 180)
+
+    while True:
+        raw = job.connection.blpop([key], timeout=block_s)
+        if raw is not None:
+            token = json.loads(raw[1])
+            final_status = JobStatus(token["status"])
+            break
+        final_status = job.get_status()
+        if final_status in terminal:
+            break
+
+    result = job.latest_result()
+    for delay in JOB_RESULT_BACKOFF_S:
+        if result is not None or final_status in (JobStatus.STOPPED, JobStatus.CANCELED):
+            break
+        time.sleep(delay)
+        result = job.latest_result()
 
-    final_status = job.get_status()
     if final_status != JobStatus.FINISHED:
-        try:
-            exc_info = job.latest_result().exc_string
-        except Exception:
-            exc_info = str(final_status)
+        exc_info = getattr(result, "exc_string", None) or str(final_status)
         raise RuntimeError(f"Job '{name}' terminou com status={final_status}: {exc_info}")
+    if result is None:
+        raise RuntimeError(f"Job '{name}' finalizou mas o resultado não foi gravado no Redis")
 
-    return job.latest_result().return_value
+    return result.return_value
 
 
 # ── Gate de aprovação ──────────────────────────────────────────────────────────
 
 
 def _wait_for_approvals(
-    conn: psycopg2.extensions.connection,
+    conn: psycopg.Connection,
     channel_id: UUID,
     candidate_ids: list[UUID],
 ) -> list[UUID]:
@@ -434,22 +549,47 @@ def _wait_for_approvals(
         return []
 
     deadline = time.time() + APPROVAL_TIMEOUT_HOURS * 3600
+    pending = {str(tid) for tid in candidate_ids}
     log.info(
-        "Aguardando aprovação manual de %d tópico(s)... (timeout=%dh, poll=%ds)",
+        "Aguardando aprovação manual de %d tópico(s)... (timeout=%dh, LISTEN %s)",
         len(candidate_ids),
         APPROVAL_TIMEOUT_HOURS,
-        APPROVAL_POLL_INTERVAL_S,
+        APPROVAL_CHANNEL,
     )
 
-    while time.time() < deadline:
+    # LISTEN só entra em vigor fora de transação: fecha a atual e usa autocommit.
+    conn.commit()
+    prev_autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        conn.execute(f"LISTEN {APPROVAL_CHANNEL}")
+
+        # Aprovações feitas antes do LISTEN não geram notificação.
         approved = _fetch_approved_topic_ids(conn, channel_id, candidate_ids)
+
+        while not approved and (remaining := deadline - time.time()) > 0:
+            notified = {
+                n.payload
+                for n in conn.notifies(timeout=min(remaining, APPROVAL_HEARTBEAT_S), stop_after=1)
+            }
+            if not notified:
+                # Heartbeat: reconsulta cobre notificações perdidas (ex: reconexão do servidor).
+                approved = _fetch_approved_topic_ids(conn, channel_id, candidate_ids)
+                if not approved:
+                    log.info(
+                        "  Nenhum tópico aprovado ainda (%.1fh restantes).",
+                        (deadline - time.time()) / 3600,
+                    )
+                continue
+
+            approved = [UUID(tid) for tid in notified & pending]
+
         if approved:
             log.info("  %d tópico(s) aprovado(s): %s", len(approved), approved)
             return approved
-        remaining_h = (deadline - time.time()) / 3600
-        log.info("  Nenhum tópico aprovado ainda. Próxima verificação em %ds (%.1fh restantes).",
-                 APPROVAL_POLL_INTERVAL_S, remaining_h)
-        time.sleep(APPROVAL_POLL_INTERVAL_S)
+    finally:
+        conn.execute(f"UNLISTEN {APPROVAL_CHANNEL}")
+        conn.autocommit = prev_autocommit
 
     log.warning("Timeout de aprovação atingido (%dh). Encerrando pipeline.", APPROVAL_TIMEOUT_HOURS)
     return []
@@ -459,21 +599,20 @@ def _wait_for_approvals(
 
 
 def _process_topic(
-    redis_conn: Redis,
-    conn: psycopg2.extensions.connection,
+    conn: psycopg.Connection,
     topic_id: UUID,
+    research_job: Job,
 ) -> VideoSpec | None:
     """Executa Researcher → Scriptwriter → FactChecker para um tópico.
 
+    Args:
+        research_job: job do Researcher já enfileirado (em lote) para o tópico.
+
     Returns:
         VideoSpec completo se aprovado, None se falhou após max tentativas.
     """
-    log.info("[%s] Iniciando Researcher...", str(topic_id)[:8])
-    q_researcher = Queue("researcher", connection=redis_conn)
-    job = q_researcher.enqueue(
-        "workers.researcher_worker.run", topic_id, job_timeout=120
-    )
-    _wait_job(job, "research_topic")
+    log.info("[%s] Aguardando Researcher...", str(topic_id)[:8])
+    _wait_job(research_job, "research_topic")
 
     video_id = _fetch_video_id(conn, topic_id)
     if video_id is None:
@@ -482,22 +621,21 @@ def _process_topic(
 
     log.info("[%s] video_id=%s — iniciando Scriptwriter...", str(topic_id)[:8], str(video_id)[:8])
 
-    q_scriptwriter = Queue("scriptwriter", connection=redis_conn)
-    q_fact_checker = Queue("fact_checker", connection=redis_conn)
+    q_scriptwriter = _QUEUES["scriptwriter"]
+    q_fact_checker = _QUEUES["fact_checker"]
 
     for attempt in range(1, MAX_FACT_CHECK_ATTEMPTS + 1):
         log.info("[%s] Tentativa %d/%d — write_script...", str(video_id)[:8], attempt, MAX_FACT_CHECK_ATTEMPTS)
-        job_script = q_scriptwriter.enqueue(
-            "workers.scriptwriter_worker.run", topic_id, job_timeout=180
+        job_script = _enqueue(
+            q_scriptwriter, _DISPATCH, "scriptwriter", topic_id, job_timeout=180
         )
         _wait_job(job_script, "write_script")
 
         log.info("[%s] Tentativa %d/%d — check_script...", str(video_id)[:8], attempt, MAX_FACT_CHECK_ATTEMPTS)
-        job_fact = q_fact_checker.enqueue(
-            "workers.fact_checker_worker.run", video_id, job_timeout=60
+        job_fact = _enqueue(
+            q_fact_checker, _DISPATCH, "fact_checker", video_id, job_timeout=60
         )
-        result_dict = _wait_job(job_fact, "check_script")
-        fact_result = FactCheckResult(**result_dict)
+        fact_result = FactCheckResult.model_validate_json(_wait_job(job_fact, "check_script"))
 
         if fact_result.approved:
             log.info("[%s] FactChecker aprovado (risk_score=%.3f).", str(video_id)[:8], fact_result.risk_score)
@@ -517,13 +655,19 @@ def _process_topic(
             return None
 
     # E3.1: calcula template_score antes do render (pausa se > 0.70)
-    calculate_template_score(video_id)
+    calculate_template_score(video_id, conn)
 
     spec = _build_video_spec(conn, video_id)
     log.info("[%s] VideoSpec construído com sucesso.", str(video_id)[:8])
     return spec
 
 
+def _process_topic_isolated(topic_id: UUID, research_job: Job) -> VideoSpec | None:
+    """Roda _process_topic com conexão própria do pool (uma transação por thread)."""
+    with _get_conn() as conn:
+        return _process_topic(conn, topic_id, research_job)
+
+
 # ── Orquestrador principal ─────────────────────────────────────────────────────
 
 
@@ -541,73 +685,88 @@ def run_pipeline(channel_id: UUID) -> list[VideoSpec]:
     log.info("Pipeline iniciado — canal %s", str(channel_id)[:8])
     log.info("=" * 60)
 
-    redis_conn = _get_redis()
-    conn = _get_conn()
     results: list[VideoSpec] = []
     videos_failed = 0
 
-    try:
-        # 1. Mine Topics
-        log.info("Etapa 1/4 — TopicMiner")
-        q_miner = Queue("topic_miner", connection=redis_conn)
-        job_miner = q_miner.enqueue(
-            "workers.topic_miner_worker.run", channel_id, job_timeout=300
-        )
-        topics_created: list[dict] = _wait_job(job_miner, "mine_topics")
-        topic_ids = [UUID(t["id"]) for t in topics_created]
-        log.info("  %d tópico(s) criados com status='pending'.", len(topic_ids))
-
-        # 2. Gate de aprovação
-        log.info("Etapa 2/4 — Aprovação manual")
-        approved_ids = _wait_for_approvals(conn, channel_id, topic_ids)
-        if not approved_ids:
-            log.warning("Nenhum tópico aprovado. Pipeline encerrado.")
-            _record_orchestrator_run(
-                conn, channel_id, "success", len(topic_ids), 0, 0,
-                int((time.monotonic() - t0) * 1000),
-            )
-            return []
-
-        # 3. Processa cada tópico aprovado
-        log.info("Etapa 3/4 — Processando %d tópico(s) aprovado(s).", len(approved_ids))
-        for topic_id in approved_ids:
-            try:
-                spec = _process_topic(redis_conn, conn, topic_id)
-                if spec:
-                    results.append(spec)
-                else:
-                    videos_failed += 1
-            except Exception as exc:
-                log.error("[%s] Erro ao processar tópico: %s", str(topic_id)[:8], exc)
-                videos_failed += 1
-
-        # 4. Registra run do orquestrador
-        duration_ms = int((time.monotonic() - t0) * 1000)
-        log.info(
-            "Etapa 4/4 — Pipeline concluído em %dms | aprovados=%d | falhos=%d",
-            duration_ms,
-            len(results),
-            videos_failed,
-        )
-        _record_orchestrator_run(
-            conn, channel_id, "success",
-            len(approved_ids), len(results), videos_failed, duration_ms,
-        )
-        return results
-
-    except Exception as exc:
-        duration_ms = int((time.monotonic() - t0) * 1000)
-        log.error("Pipeline falhou: %s", exc)
+    with _get_conn() as conn:
         try:
+            # 1. Mine Topics
+            log.info("Etapa 1/4 — TopicMiner")
+            q_miner = _QUEUES["topic_miner"]
+            job_miner = _enqueue(
+                q_miner, _DISPATCH, "topic_miner", channel_id, job_timeout=300
+            )
+            topics_created: list[dict] = orjson.loads(_wait_job(job_miner, "mine_topics"))
+            topic_ids = [UUID(t["id"]) for t in topics_created]
+            log.info("  %d tópico(s) criados com status='pending'.", len(topic_ids))
+
+            # 2. Gate de aprovação
+            log.info("Etapa 2/4 — Aprovação manual")
+            approved_ids = _wait_for_approvals(conn, channel_id, topic_ids)
+            if not approved_ids:
+                log.warning("Nenhum tópico aprovado. Pipeline encerrado.")
+                _record_orchestrator_run(
+                    conn, channel_id, "success", len(topic_ids), 0, 0,
+                    int((time.monotonic() - t0) * 1000),
+                )
+                return []
+
+            # 3. Processa cada tópico aprovado
+            log.info("Etapa 3/4 — Processando %d tópico(s) aprovado(s).", len(approved_ids))
+            # Researcher de todos os tópicos enfileirado de uma vez (1 RTT em vez de N)
+            q_researcher = _QUEUES["researcher"]
+            research_jobs = _enqueue_many(
+                q_researcher,
+                _DISPATCH,
+                [("researcher", topic_id) for topic_id in approved_ids],
+                job_timeout=120,
+            )
+            # Tópicos são independentes e passam quase todo o tempo bloqueados em
+            # RQ/Redis: processa em paralelo (wall-clock ≈ tópico mais lento).
+            max_workers = min(MAX_PARALLEL_TOPICS, len(approved_ids))
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="topic"
+            ) as executor:
+                futures = {
+                    executor.submit(_process_topic_isolated, topic_id, research_job): topic_id
+                    for topic_id, research_job in zip(approved_ids, research_jobs)
+                }
+                for future in as_completed(futures):
+                    topic_id = futures[future]
+                    try:
+                        spec = future.result()
+                        if spec:
+                            results.append(spec)
+                        else:
+                            videos_failed += 1
+                    except Exception as exc:
+                        log.error("[%s] Erro ao processar tópico: %s", str(topic_id)[:8], exc)
+                        videos_failed += 1
+
+            # 4. Registra run do orquestrador
+            duration_ms = int((time.monotonic() - t0) * 1000)
+            log.info(
+                "Etapa 4/4 — Pipeline concluído em %dms | aprovados=%d | falhos=%d",
+                duration_ms,
+                len(results),
+                videos_failed,
+            )
             _record_orchestrator_run(
-                conn, channel_id, "failed", 0, 0, 0, duration_ms, str(exc)
+                conn, channel_id, "success",
+                len(approved_ids), len(results), videos_failed, duration_ms,
             )
-        except Exception:
-            pass
-        raise
+            return results
 
-    finally:
-        conn.close()
+        except Exception as exc:
+            duration_ms = int((time.monotonic() - t0) * 1000)
+            log.error("Pipeline falhou: %s", exc)
+            try:
+                _record_orchestrator_run(
+                    conn, channel_id, "failed", 0, 0, 0, duration_ms, str(exc)
+                )
+            except Exception:
+                pass
+            raise
 
 
 # ── Execução principal ─────────────────────────────────────────────────────────
@@ -621,11 +780,8 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    _conn = _get_conn()
-    try:
+    with _get_conn() as _conn:
         _channel_id = _fetch_channel_id(_conn)
-    finally:
-        _conn.close()
 
     log.info("Canal: %s", _channel_id)
 
@@ -646,12 +802,9 @@ if __name__ == "__main__":
         )
         # Sumário diário às 23h (após o pipeline do dia)
         def _run_daily_tasks() -> None:
-            _c = _get_conn()
-            try:
+            with _get_conn() as _c:
                 daily_summary(_c)
-                rotate_logs(max_days=30)
-            finally:
-                _c.close()
+            rotate_logs(max_days=30)
 
         scheduler.add_job(
             _run_daily_tasks,
@@ -8,6 +8,9 @@ Uso:
 """
 from __future__ import annotations
 
+import functools
+import importlib.util
+import io
 import os
 import re
 import sys
@@ -27,12 +30,21 @@ MODEL_PATH = Path(__file__).parent / "models" / "ranker.pkl"
 
 FEATURE_NAMES = ["similarity_score", "has_numeric_claim", "day_of_week", "title_word_count"]
 
+_DIGIT_RE = re.compile(r"\d")
+
+# Compressão do modelo persistido: lz4 (descompressão mais rápida) se instalado,
+# senão zlib nível 3. joblib.load detecta o formato sozinho.
+MODEL_COMPRESS: tuple[str, int] | int = ("lz4", 3) if importlib.util.find_spec("lz4") else 3
+
 
 # ── Extração de features ───────────────────────────────────────────────────────
 
 
-def _extract_features(row: dict | pd.Series) -> list[float]:
-    """Extrai as 4 features de um tópico (dict ou linha de DataFrame).
+def _extract_features(row: dict | pd.Series, out: np.ndarray) -> np.ndarray:
+    """Extrai as 4 features de um tópico (dict ou linha de DataFrame) em out.
+
+    Escreve direto na linha out (shape (4,)) da matriz pré-alocada, sem
+    criar lista intermediária.
 
     Features:
         similarity_score   (float): cosine similarity com scripts anteriores; default 0.0
@@ -40,15 +52,27 @@ def _extract_features(row: dict | pd.Series) -> list[float]:
         day_of_week        (int):   dia da semana de created_at (0=segunda, 6=domingo)
         title_word_count   (int):   quantidade de palavras no título
     """
-    similarity_score = float(row.get("similarity_score") or 0.0)
-    has_numeric_claim = 1 if re.search(r"\d", str(row.get("title", ""))) else 0
+    title = str(row.get("title", ""))
     created_at = row.get("created_at")
-    if created_at is not None:
-        day_of_week = int(pd.to_datetime(created_at).dayofweek)
-    else:
-        day_of_week = 0
-    title_word_count = len(str(row.get("title", "")).split())
-    return [similarity_score, has_numeric_claim, day_of_week, title_word_count]
+    out[0] = float(row.get("similarity_score") or 0.0)
+    out[1] = 1.0 if _DIGIT_RE.search(title) else 0.0
+    out[2] = pd.Timestamp(created_at).dayofweek if created_at is not None else 0
+    out[3] = len(title.split())
+    return out
+
+
+def _extract_features_frame(df: pd.DataFrame) -> np.ndarray:
+    """Versão vetorizada de _extract_features para um DataFrame inteiro.
+
+    Mesmas 4 features, calculadas coluna a coluna (pandas/NumPy) em vez de
+    linha a linha — evita o custo de iterrows() no treino.
+    """
+    titles = df["title"].astype(str)
+    sim = df["similarity_score"].fillna(0.0).to_numpy(dtype=float)
+    num = titles.str.contains(r"\d", regex=True).to_numpy(dtype=float)
+    dow = pd.to_datetime(df["created_at"]).dt.dayofweek.fillna(0).to_numpy(dtype=float)
+    wc = titles.str.split().str.len().to_numpy(dtype=float)
+    return np.column_stack([sim, num, dow, wc])
 
 
 # ── Treino ─────────────────────────────────────────────────────────────────────
@@ -72,8 +96,7 @@ def train_ranker(df: pd.DataFrame) -> Pipeline:
     MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     # Monta matriz de features
-    X_rows = [_extract_features(row) for _, row in df.iterrows()]
-    X = np.array(X_rows, dtype=float)
+    X = _extract_features_frame(df)
     y = df["avg_view_duration_sec"].astype(float).values
 
     # Pipeline: normalização + modelo
@@ -89,7 +112,7 @@ def train_ranker(df: pd.DataFrame) -> Pipeline:
     pipeline.fit(X, y)
 
     # Persiste o modelo
-    joblib.dump(pipeline, MODEL_PATH)
+    joblib.dump(pipeline, MODEL_PATH, compress=MODEL_COMPRESS)
 
     # Imprime feature importances
     gbr: GradientBoostingRegressor = pipeline.named_steps["gbr"]
@@ -104,6 +127,16 @@ def train_ranker(df: pd.DataFrame) -> Pipeline:
 # ── Scoring ────────────────────────────────────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=1)
+def _load_pipeline(mtime_ns: int) -> Pipeline:
+    """Carrega o modelo do disco uma vez por versão do arquivo.
+
+    A chave é o mtime de models/ranker.pkl: um retreino (novo dump) invalida
+    o cache automaticamente, sem reiniciar o processo.
+    """
+    return joblib.load(MODEL_PATH)
+
+
 def score_topics(topics: list[dict]) -> list[tuple[dict, float]]:
     """Aplica o ranker a uma lista de tópicos e retorna ordenados por score previsto.
 
@@ -120,10 +153,13 @@ def score_topics(topics: list[dict]) -> list[tuple[dict, float]]:
     if not MODEL_PATH.exists():
         raise FileNotFoundError(f"Modelo não encontrado em {MODEL_PATH}. Execute: uv run python ranker.py train")
 
-    pipeline: Pipeline = joblib.load(MODEL_PATH)
+    pipeline = _load_pipeline(MODEL_PATH.stat().st_mtime_ns)
 
-    X_rows = [_extract_features(t) for t in topics]
-    X = np.array(X_rows, dtype=float)
+    # Pré-alocada em float64, o mesmo dtype das features do treino: evita o
+    # arredondamento de float32 antes do scaler/estimador
+    X = np.empty((len(topics), len(FEATURE_NAMES)), dtype=np.float64)
+    for i, topic in enumerate(topics):
+        _extract_features(topic, X[i])
     scores = pipeline.predict(X).tolist()
 
     ranked = sorted(zip(topics, scores), key=lambda x: x[1], reverse=True)
@@ -154,24 +190,28 @@ if __name__ == "__main__":
         print("Conectando ao banco...")
         conn = psycopg2.connect(db_url, connect_timeout=10)
 
+        training_sql = """
+            SELECT
+                t.title,
+                COALESCE(t.similarity_score, 0.0) AS similarity_score,
+                t.created_at,
+                AVG(pd.avg_view_duration_sec) AS avg_view_duration_sec
+            FROM topics t
+            JOIN videos v ON v.topic_id = t.id
+            JOIN performance_daily pd ON pd.video_id = v.id
+            WHERE pd.avg_view_duration_sec IS NOT NULL
+            GROUP BY t.id, t.title, t.similarity_score, t.created_at
+        """
+        # COPY TO STDOUT: o pandas faz o parse do CSV em C, sem criar um objeto
+        # Python por célula como faria pd.read_sql.
+        buf = io.StringIO()
         try:
-            df = pd.read_sql(
-                """
-                SELECT
-                    t.title,
-                    COALESCE(t.similarity_score, 0.0) AS similarity_score,
-                    t.created_at,
-                    AVG(pd.avg_view_duration_sec) AS avg_view_duration_sec
-                FROM topics t
-                JOIN videos v ON v.topic_id = t.id
-                JOIN performance_daily pd ON pd.video_id = v.id
-                WHERE pd.avg_view_duration_sec IS NOT NULL
-                GROUP BY t.id, t.title, t.similarity_score, t.created_at
-                """,
-                conn,
-            )
+            with conn.cursor() as cur:
+                cur.copy_expert(f"COPY ({training_sql}) TO STDOUT WITH CSV HEADER", buf)
         finally:
             conn.close()
+        buf.seek(0)
+        df = pd.read_csv(buf, dtype={"title": str}, parse_dates=["created_at"])
 
         print(f"Registros encontrados: {len(df)}")
 
@@ -0,0 +1,69 @@
+"""scripts/_db.py — Pool de conexões Postgres compartilhado pelos scripts.
+
+Centraliza a configuração de conexão (SUPABASE_DB_URL, timeouts, prepared
+statements) usada por apply_migrations, seed_channel e import_metrics.
+
+Uso:
+    from scripts._db import connection
+
+    with connection() as conn:   # commit ao sair; rollback se houver exceção
+        conn.execute(...)
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from contextlib import AbstractContextManager
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = int(os.getenv("SCRIPTS_DB_POOL_MAX_SIZE", "4"))
+POOL_OPEN_TIMEOUT_S = 10.0
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Retorna o pool do processo, criando-o (e aguardando a 1ª conexão) no primeiro uso.
+
+    Raises:
+        RuntimeError: se SUPABASE_DB_URL não estiver definido.
+        psycopg_pool.PoolTimeout: se o banco não aceitar conexão em
+            POOL_OPEN_TIMEOUT_S (o motivo é logado pelo logger "psycopg.pool").
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            db_url = os.getenv("SUPABASE_DB_URL")
+            if not db_url:
+                raise RuntimeError("SUPABASE_DB_URL não definido no .env")
+            pool = ConnectionPool(
+                db_url,
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                # prepare_threshold=1: statement repetido vira prepared na 2ª execução
+                kwargs={"connect_timeout": 10, "prepare_threshold": 1},
+                name="apogee-scripts",
+                open=True,
+            )
+            try:
+                # Falha rápido (como um connect direto) em vez de só no primeiro uso
+                pool.wait(timeout=POOL_OPEN_TIMEOUT_S)
+            except Exception:
+                pool.close()
+                raise
+            atexit.register(pool.close)
+            _pool = pool
+    return _pool
+
+
+def connection() -> AbstractContextManager[psycopg.Connection]:
+    """Empresta uma conexão do pool; commit/rollback e devolução ao sair do with."""
+    return get_pool().connection()
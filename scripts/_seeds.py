@@ -0,0 +1,51 @@
+"""scripts/_seeds.py — Dados de seed compartilhados.
+
+Usado por seed_channel.py e por apply_migrations.py --seed (que insere o canal
+na mesma sessão das migrations, sem abrir outra conexão).
+"""
+
+from __future__ import annotations
+
+import logging
+
+import psycopg
+
+log = logging.getLogger(__name__)
+
+# ── Dados do canal ────────────────────────────────────────────
+CHANNEL_DATA = {
+    "channel_name": "Apogee Engine",
+    "niche": "tecnologia e inteligência artificial",
+    "tone": "educativo-direto",
+    "target_audience": (
+        "Profissionais e entusiastas de tecnologia, 25–40 anos, "
+        "interessados em IA aplicada, automação e produtividade"
+    ),
+    "language": "pt-BR",
+    "weekly_target": 2,
+    "youtube_channel_id": None,  # preencher após criar o canal no YouTube
+}
+
+INSERT_SQL = """
+INSERT INTO channel_config (
+    channel_name, niche, tone, target_audience,
+    language, weekly_target, youtube_channel_id
+)
+VALUES (
+    %(channel_name)s, %(niche)s, %(tone)s, %(target_audience)s,
+    %(language)s, %(weekly_target)s, %(youtube_channel_id)s
+)
+ON CONFLICT (channel_name) DO NOTHING
+RETURNING id;
+"""
+
+
+def insert_channel(conn: psycopg.Connection) -> None:
+    """Insere o canal padrão em channel_config (idempotente). Não faz commit."""
+    with conn.cursor() as cur:
+        cur.execute(INSERT_SQL, CHANNEL_DATA)
+        row = cur.fetchone()
+    if row:
+        log.info("Canal inserido com id=%s", row[0])
+    else:
+        log.info("Canal '%s' já existe — nada inserido.", CHANNEL_DATA["channel_name"])
@@ -1,7 +1,8 @@
 """scripts/alerting.py — Alertas e rotação de logs para o pipeline Apogee.
 
 Funções:
-    send_alert(title, message, level)  — Slack webhook ou log de fallback
+    send_alert(title, message, level)  — Slack webhook (assíncrono) ou log de fallback
+    flush_alerts(timeout)              — Aguarda envio dos alertas enfileirados
     rotate_logs(max_days)              — Remove logs mais antigos que N dias
     daily_summary(conn)                — Resumo diário de execução (vídeos, custo, erros)
 
@@ -15,19 +16,23 @@ Uso:
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
+import queue
 import sys
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import psycopg2
-import psycopg2.extras
+import psycopg
 import requests
 from dotenv import load_dotenv
+from psycopg.rows import dict_row
 
 load_dotenv()
 
@@ -38,6 +43,17 @@ LOGS_DIR = ROOT / "artifacts" / "logs"
 
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
 
+# Sessão HTTP reutilizada: keep-alive evita um handshake TCP+TLS por alerta.
+_SESSION = requests.Session()
+
+# Envio assíncrono: send_alert só enfileira; uma thread daemon faz o POST,
+# então o pipeline nunca bloqueia no webhook (timeout de 5s por alerta).
+ALERT_QUEUE_MAXSIZE = 256
+ALERT_FLUSH_TIMEOUT_S = 10.0
+_ALERT_Q: queue.Queue[dict] = queue.Queue(maxsize=ALERT_QUEUE_MAXSIZE)
+_alert_thread: threading.Thread | None = None
+_alert_thread_lock = threading.Lock()
+
 
 # ── Alertas ────────────────────────────────────────────────────────────────────
 
@@ -45,6 +61,8 @@ SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
 def send_alert(title: str, message: str, level: str = "error") -> None:
     """Envia alerta para Slack (se configurado) ou loga como fallback.
 
+    Não bloqueia: o payload é enfileirado e postado por uma thread de fundo.
+
     Args:
         title:   Título curto do alerta (ex: "Vídeo falhou").
         message: Detalhes do alerta.
@@ -71,14 +89,66 @@ def send_alert(title: str, message: str, level: str = "error") -> None:
             }
         ],
     }
+    _ensure_alert_thread()
+    try:
+        _ALERT_Q.put_nowait(payload)
+    except queue.Full:
+        log.warning("Fila de alertas Slack cheia — alerta descartado: %s", title)
+
+
+def _post_to_slack(payload: dict) -> None:
     try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=5)
+        resp = _SESSION.post(SLACK_WEBHOOK_URL, json=payload, timeout=5)
         if resp.status_code != 200:
             log.warning("Slack webhook retornou %d: %s", resp.status_code, resp.text)
     except Exception as exc:
         log.warning("Falha ao enviar alerta Slack: %s", exc)
 
 
+def _alert_worker() -> None:
+    while True:
+        payload = _ALERT_Q.get()
+        try:
+            _post_to_slack(payload)
+        finally:
+            _ALERT_Q.task_done()
+
+
+def _ensure_alert_thread() -> None:
+    """Inicia a thread de envio na primeira chamada (nada roda só por importar)."""
+    global _alert_thread
+    if _alert_thread is not None:
+        return
+    with _alert_thread_lock:
+        if _alert_thread is None:
+            thread = threading.Thread(target=_alert_worker, name="slack-alerts", daemon=True)
+            thread.start()
+            _alert_thread = thread
+
+
+def flush_alerts(timeout: float = ALERT_FLUSH_TIMEOUT_S) -> bool:
+    """Aguarda o envio dos alertas pendentes (até timeout segundos).
+
+    Chamada automaticamente na saída do processo, para que alertas
+    enfileirados logo antes do exit (ex: CLI --summary) não se percam.
+
+    Returns:
+        True se a fila foi esvaziada dentro do prazo.
+    """
+    if _alert_thread is None:
+        return True
+    deadline = time.monotonic() + timeout
+    while _ALERT_Q.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            log.warning("flush_alerts: %d alerta(s) não enviados", _ALERT_Q.unfinished_tasks)
+            return False
+        time.sleep(0.05)
+    return True
+
+
+atexit.register(flush_alerts)
+
+
 # ── Rotação de logs ────────────────────────────────────────────────────────────
 
 
@@ -94,18 +164,22 @@ def rotate_logs(max_days: int = 30) -> int:
     if not LOGS_DIR.exists():
         return 0
 
-    cutoff = datetime.now(timezone.utc) - timedelta(days=max_days)
+    # Comparação em float (Unix timestamp): sem datetime por arquivo.
+    cutoff_ts = (datetime.now(timezone.utc) - timedelta(days=max_days)).timestamp()
     removed = 0
 
-    for log_file in LOGS_DIR.glob("*.log"):
-        mtime = datetime.fromtimestamp(log_file.stat().st_mtime, tz=timezone.utc)
-        if mtime < cutoff:
+    with os.scandir(LOGS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".log") or not entry.is_file():
+                continue
             try:
-                log_file.unlink()
-                log.info("Log removido (rotação): %s", log_file.name)
+                if entry.stat().st_mtime >= cutoff_ts:
+                    continue
+                os.unlink(entry.path)
+                log.info("Log removido (rotação): %s", entry.name)
                 removed += 1
             except OSError as exc:
-                log.warning("Erro ao remover log %s: %s", log_file.name, exc)
+                log.warning("Erro ao remover log %s: %s", entry.name, exc)
 
     if removed:
         log.info("Rotação de logs: %d arquivo(s) removido(s) (> %d dias)", removed, max_days)
@@ -115,52 +189,60 @@ def rotate_logs(max_days: int = 30) -> int:
 # ── Sumário diário ─────────────────────────────────────────────────────────────
 
 
-def daily_summary(conn: psycopg2.extensions.connection) -> dict:
+def daily_summary(conn: psycopg.Connection) -> dict:
     """Gera e envia sumário diário de execução do pipeline.
 
+    As três consultas são enviadas em pipeline mode (um único round-trip).
+
+    Não abre conexão própria: o chamador fornece (e reutiliza) a conexão,
+    idealmente vinda de um pool.
+
     Args:
-        conn: Conexão psycopg2 ao Supabase.
+        conn: Conexão psycopg (3) ao Supabase.
 
     Returns:
         Dict com métricas: videos_rendered, videos_failed, total_cost_usd, errors.
     """
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        # Vídeos do último dia
-        cur.execute(
-            """
-            SELECT
-                COUNT(*) FILTER (WHERE status = 'rendered')  AS rendered,
-                COUNT(*) FILTER (WHERE status = 'published') AS published,
-                COUNT(*) FILTER (WHERE status = 'failed')    AS failed
-            FROM videos
-            WHERE updated_at >= NOW() - INTERVAL '24 hours'
-            """
-        )
-        videos = dict(cur.fetchone())  # type: ignore[arg-type]
-
-        # Custo do último dia
-        cur.execute(
-            """
-            SELECT COALESCE(SUM(cost_usd), 0) AS total_cost
-            FROM agent_runs
-            WHERE created_at >= NOW() - INTERVAL '24 hours'
-            """
-        )
-        cost_row = cur.fetchone()
+    with (
+        conn.cursor(row_factory=dict_row) as cur_videos,
+        conn.cursor(row_factory=dict_row) as cur_cost,
+        conn.cursor(row_factory=dict_row) as cur_errors,
+    ):
+        with conn.pipeline():
+            # Vídeos do último dia
+            cur_videos.execute(
+                """
+                SELECT
+                    COUNT(*) FILTER (WHERE status = 'rendered')  AS rendered,
+                    COUNT(*) FILTER (WHERE status = 'published') AS published,
+                    COUNT(*) FILTER (WHERE status = 'failed')    AS failed
+                FROM videos
+                WHERE updated_at >= NOW() - INTERVAL '24 hours'
+                """
+            )
+            # Custo do último dia
+            cur_cost.execute(
+                """
+                SELECT COALESCE(SUM(cost_usd), 0) AS total_cost
+                FROM agent_runs
+                WHERE created_at >= NOW() - INTERVAL '24 hours'
+                """
+            )
+            # Erros do último dia
+            cur_errors.execute(
+                """
+                SELECT agent_name, error_message
+                FROM agent_runs
+                WHERE status = 'failed'
+                  AND created_at >= NOW() - INTERVAL '24 hours'
+                ORDER BY created_at DESC
+                LIMIT 5
+                """
+            )
+        videos = dict(cur_videos.fetchone())  # type: ignore[arg-type]
+        cost_row = cur_cost.fetchone()
         total_cost = float(cost_row["total_cost"]) if cost_row else 0.0  # type: ignore[index]
-
-        # Erros do último dia
-        cur.execute(
-            """
-            SELECT agent_name, error_message
-            FROM agent_runs
-            WHERE status = 'failed'
-              AND created_at >= NOW() - INTERVAL '24 hours'
-            ORDER BY created_at DESC
-            LIMIT 5
-            """
-        )
-        errors = [dict(r) for r in cur.fetchall()]
+        errors = [dict(r) for r in cur_errors.fetchall()]
 
     summary = {
         "videos_rendered": int(videos.get("rendered", 0)),
@@ -202,7 +284,7 @@ if __name__ == "__main__":
         if not _db_url:
             print("SUPABASE_DB_URL não definido")
             sys.exit(1)
-        _conn = psycopg2.connect(_db_url, connect_timeout=10)
+        _conn = psycopg.connect(_db_url, connect_timeout=10)
         try:
             s = daily_summary(_conn)
             print(json.dumps(s, indent=2, ensure_ascii=False))
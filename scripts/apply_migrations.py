@@ -1,10 +1,11 @@
 """scripts/apply_migrations.py – Apogee migration runner.
 
 Lê todos os arquivos migrations/*.sql em ordem numérica e executa
-no Supabase via psycopg2 usando SUPABASE_DB_URL do .env.
+no Supabase via psycopg usando SUPABASE_DB_URL do .env.
 
 Uso:
     uv run python scripts/apply_migrations.py
+    uv run python scripts/apply_migrations.py --seed   # + canal padrão (seed_channel)
 """
 
 from __future__ import annotations
@@ -14,9 +15,15 @@ import os
 import sys
 from pathlib import Path
 
-import psycopg2
+# Adiciona raiz do projeto ao sys.path (2 níveis acima de scripts/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import psycopg
 from dotenv import load_dotenv
 
+from scripts._db import connection, get_pool
+from scripts._seeds import insert_channel
+
 load_dotenv()
 
 logging.basicConfig(
@@ -31,19 +38,47 @@ MIGRATIONS_DIR = Path(__file__).parent.parent / "migrations"
 
 def get_migration_files() -> list[Path]:
     """Retorna arquivos .sql da pasta migrations/ em ordem numérica."""
-    files = sorted(MIGRATIONS_DIR.glob("*.sql"))
+    # scandir: uma passada de readdir, tipo via d_type (sem stat por entrada)
+    with os.scandir(MIGRATIONS_DIR) as it:
+        names = sorted(
+            e.name for e in it if e.name.endswith(".sql") and e.is_file(follow_symlinks=False)
+        )
+    files = [MIGRATIONS_DIR / name for name in names]
     if not files:
         log.warning("Nenhum arquivo .sql encontrado em %s", MIGRATIONS_DIR)
     return files
 
 
-def apply_migrations() -> None:
-    """Executa todos os arquivos de migration em ordem, com rollback em falha."""
-    db_url = os.getenv("SUPABASE_DB_URL")
-    if not db_url:
-        log.error("SUPABASE_DB_URL não definido no .env")
-        sys.exit(1)
+def _apply_one_by_one(conn: psycopg.Connection, files: list[Path]) -> None:
+    """Aplica cada arquivo em sua própria transação; encerra no primeiro erro."""
+    for migration_file in files:
+        log.info("Aplicando: %s", migration_file.name)
+        sql = migration_file.read_bytes()
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+            conn.commit()
+            log.info("✓ %s aplicado com sucesso.", migration_file.name)
+        except Exception as exc:
+            conn.rollback()
+            log.error("✗ Falha em %s: %s", migration_file.name, exc)
+            sys.exit(1)
+
+
+def apply_migrations(seed: bool = False) -> None:
+    """Executa todos os arquivos de migration em ordem, com rollback em falha.
+
+    Caminho normal: todos os arquivos concatenados em um único envio, numa
+    única transação (1 round-trip em vez de N). Se algo falhar, a transação
+    inteira é desfeita e os arquivos são reaplicados um a um — o que
+    identifica o arquivo com erro e mantém o comportamento anterior
+    (arquivos antes da falha ficam aplicados).
 
+    Args:
+        seed: Se True, insere também o canal padrão (scripts/_seeds.py) na
+              mesma conexão, após as migrations.
+    """
     files = get_migration_files()
     if not files:
         log.info("Nada a executar.")
@@ -51,31 +86,51 @@ def apply_migrations() -> None:
 
     log.info("Conectando ao banco de dados...")
     try:
-        conn = psycopg2.connect(db_url, connect_timeout=10)
+        get_pool()
     except Exception as exc:
         log.error("Falha ao conectar: %s", exc)
         sys.exit(1)
 
-    conn.autocommit = False
-
-    for migration_file in files:
-        log.info("Aplicando: %s", migration_file.name)
-        sql = migration_file.read_text(encoding="utf-8")
-
+    # "\n;\n" entre arquivos: fecha o último statement mesmo sem ";" final
+    # ou terminado em comentário "--".
+    # Bytes direto ao libpq (arquivos em UTF-8, como a conexão): sem decodificar
+    # para str só para o psycopg codificar de volta.
+    combined = b"\n;\n".join(f.read_bytes() for f in files)
+    log.info(
+        "Aplicando %d migration(s) em uma transação: %s",
+        len(files),
+        ", ".join(f.name for f in files),
+    )
+    with connection() as conn:
         try:
             with conn.cursor() as cur:
-                cur.execute(sql)
+                cur.execute(combined)
             conn.commit()
-            log.info("✓ %s aplicado com sucesso.", migration_file.name)
         except Exception as exc:
             conn.rollback()
-            log.error("✗ Falha em %s: %s", migration_file.name, exc)
-            conn.close()
-            sys.exit(1)
+            log.warning("Falha no envio único (%s) — reaplicando arquivo a arquivo.", exc)
+            _apply_one_by_one(conn, files)
+        log.info("Todas as migrations aplicadas com sucesso.")
 
-    conn.close()
-    log.info("Todas as migrations aplicadas com sucesso.")
+        if seed:
+            try:
+                insert_channel(conn)
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                log.error("Falha ao inserir canal: %s", exc)
+                sys.exit(1)
 
 
 if __name__ == "__main__":
-    apply_migrations()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aplica migrations/*.sql no Supabase.")
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="Insere também o canal padrão (equivale a rodar seed_channel.py em seguida).",
+    )
+    args = parser.parse_args()
+
+    apply_migrations(seed=args.seed)
@@ -16,7 +16,9 @@ import importlib
 import logging
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Callable
 
 from dotenv import load_dotenv
@@ -32,15 +34,20 @@ RED = "\033[91m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
 
+# Checks rodam em threads paralelas: uma linha de saída por vez
+_print_lock = threading.Lock()
+
 
 def _ok(label: str, detail: str = "") -> None:
     suffix = f"  → {detail}" if detail else ""
-    print(f"  {GREEN}[OK]  {RESET} {label}{suffix}")
+    with _print_lock:
+        print(f"  {GREEN}[OK]  {RESET} {label}{suffix}")
 
 
 def _fail(label: str, reason: str = "") -> None:
     suffix = f"  → {reason}" if reason else ""
-    print(f"  {RED}[FAIL]{RESET} {label}{suffix}")
+    with _print_lock:
+        print(f"  {RED}[FAIL]{RESET} {label}{suffix}")
 
 
 # ── Checks individuais ───────────────────────────────────────────────────────
@@ -81,56 +88,64 @@ def check_redis() -> bool:
         return False
 
 
-def check_supabase_rest() -> bool:
-    """Testa a API REST do Supabase (não requer tabelas existentes)."""
-    try:
-        from supabase import create_client  # noqa: PLC0415
-
-        url = os.getenv("SUPABASE_URL", "")
-        key = os.getenv("SUPABASE_KEY", "")
-        if not url or not key:
-            _fail("Supabase REST", "SUPABASE_URL ou SUPABASE_KEY não definidos")
-            return False
+def check_supabase() -> bool:
+    """Testa o Supabase pelos dois caminhos usados pelo projeto, em um único check.
 
-        client = create_client(url, key)
-        # Tenta buscar da tabela agent_runs; PGRST116 = tabela não existe ainda (OK)
-        response = client.table("agent_runs").select("id").limit(1).execute()
-        _ok("Supabase REST", f"{url}")
-        return True
-    except Exception as exc:
-        msg = str(exc)
-        # PGRST116/PGRST205 = tabela não existe — esperado antes das migrations
-        if "PGRST116" in msg or "PGRST205" in msg or "does not exist" in msg:
-            _ok("Supabase REST", "conectado (tabela agent_runs ainda não existe – OK)")
-            return True
-        _fail("Supabase REST", msg[:120])
+    1. REST (PostgREST): um GET leve via httpx — não requer tabelas existentes.
+    2. Postgres direto via psycopg: versão e banco, em pipeline mode (1 round-trip).
+    """
+    url = os.getenv("SUPABASE_URL", "")
+    key = os.getenv("SUPABASE_KEY", "")
+    db_url = os.getenv("SUPABASE_DB_URL", "")
+    if not url or not key:
+        _fail("Supabase", "SUPABASE_URL ou SUPABASE_KEY não definidos")
+        return False
+    if not db_url:
+        _fail("Supabase", "SUPABASE_DB_URL não definido")
         return False
 
-
-def check_postgres_direct() -> bool:
-    """Testa conexão direta ao Postgres via psycopg2."""
     try:
-        import psycopg2  # noqa: PLC0415
-
-        db_url = os.getenv("SUPABASE_DB_URL", "")
-        if not db_url:
-            _fail("Postgres direct", "SUPABASE_DB_URL não definido")
+        import httpx  # noqa: PLC0415
+
+        resp = httpx.get(
+            f"{url.rstrip('/')}/rest/v1/agent_runs",
+            params={"select": "id", "limit": "1"},
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=5,
+        )
+        # PGRST116/PGRST205 = tabela não existe — esperado antes das migrations
+        if resp.status_code != 200 and not any(
+            code in resp.text for code in ("PGRST116", "PGRST205", "does not exist")
+        ):
+            _fail("Supabase", f"REST {resp.status_code}: {resp.text[:100]}")
             return False
+    except Exception as exc:
+        _fail("Supabase", f"REST: {str(exc)[:110]}")
+        return False
 
-        conn = psycopg2.connect(db_url, connect_timeout=5)
-        cur = conn.cursor()
-        cur.execute("SELECT 1")
-        cur.close()
-        conn.close()
-        _ok("Postgres direct", "SELECT 1 OK")
-        return True
+    try:
+        import psycopg  # noqa: PLC0415
+
+        with (
+            psycopg.connect(db_url, connect_timeout=5) as conn,
+            conn.cursor() as cur_version,
+            conn.cursor() as cur_db,
+        ):
+            with conn.pipeline():
+                cur_version.execute("SHOW server_version")
+                cur_db.execute("SELECT current_database()")
+            server_version = cur_version.fetchone()[0]
+            database = cur_db.fetchone()[0]
     except Exception as exc:
-        _fail("Postgres direct", str(exc)[:120])
+        _fail("Supabase", f"Postgres: {str(exc)[:110]}")
         return False
 
+    _ok("Supabase", f"REST + Postgres {server_version} ({database}) OK — {url}")
+    return True
+
 
 def check_anthropic() -> bool:
-    """Verifica que a chave Anthropic é aceita (lista modelos, sem consumo de tokens)."""
+    """Verifica que a chave Anthropic é aceita (1 modelo listado, sem consumo de tokens)."""
     try:
         import anthropic  # noqa: PLC0415
 
@@ -140,9 +155,10 @@ def check_anthropic() -> bool:
             return False
 
         client = anthropic.Anthropic(api_key=key)
-        models = client.models.list()
-        count = len(list(models))
-        _ok("Anthropic", f"{count} modelos disponíveis")
+        # limit=1 e só a primeira página: iterar o resultado paginaria a lista inteira
+        page = client.models.list(limit=1)
+        first = page.data[0].id if page.data else "nenhum modelo"
+        _ok("Anthropic", f"chave aceita ({first})")
         return True
     except Exception as exc:
         _fail("Anthropic", str(exc)[:120])
@@ -150,7 +166,7 @@ def check_anthropic() -> bool:
 
 
 def check_langsmith() -> bool:
-    """Verifica que o LangSmith aceita a chave (lista projetos)."""
+    """Verifica que o LangSmith aceita a chave (busca 1 projeto)."""
     try:
         import langsmith  # noqa: PLC0415
 
@@ -160,8 +176,9 @@ def check_langsmith() -> bool:
             return False
 
         client = langsmith.Client(api_key=key)
-        projects = list(client.list_projects())
-        _ok("LangSmith", f"{len(projects)} projeto(s)")
+        # Para no primeiro item: list_projects() é um iterador paginado
+        first = next(iter(client.list_projects(limit=1)), None)
+        _ok("LangSmith", f"chave aceita ({first.name if first else 'nenhum projeto'})")
         return True
     except Exception as exc:
         _fail("LangSmith", str(exc)[:120])
@@ -173,7 +190,13 @@ def check_sentence_transformers() -> bool:
     try:
         from sentence_transformers import SentenceTransformer  # noqa: PLC0415
 
-        model = SentenceTransformer("all-MiniLM-L6-v2")
+        try:
+            # Modelo já no cache local (HF / SENTENCE_TRANSFORMERS_HOME): carrega
+            # sem rede — sem consulta de revisão nem verificação de hash no Hub.
+            model = SentenceTransformer("all-MiniLM-L6-v2", local_files_only=True)
+        except OSError:
+            # Primeira execução: baixa para o cache padrão, o mesmo usado pelos agentes
+            model = SentenceTransformer("all-MiniLM-L6-v2")
         embedding = model.encode("test")
         dim = len(embedding)
         if dim != 384:
@@ -205,8 +228,7 @@ def check_edge_tts() -> bool:
 CHECKS: list[tuple[str, Callable[[], bool]]] = [
     ("ENV VARS", check_env_vars),
     ("Redis", check_redis),
-    ("Supabase REST", check_supabase_rest),
-    ("Postgres direct", check_postgres_direct),
+    ("Supabase", check_supabase),
     ("Anthropic", check_anthropic),
     ("LangSmith", check_langsmith),
     ("sentence-transformers", check_sentence_transformers),
@@ -214,19 +236,30 @@ CHECKS: list[tuple[str, Callable[[], bool]]] = [
 ]
 
 
+def _run_check(name: str, fn: Callable[[], bool]) -> bool:
+    try:
+        return fn()
+    except Exception as exc:
+        _fail(name, f"erro inesperado: {exc}")
+        return False
+
+
 def main() -> None:
-    """Executa todos os checks e imprime um sumário final."""
+    """Executa todos os checks em paralelo e imprime um sumário final.
+
+    Os checks são independentes e quase todos limitados por rede: em threads,
+    o tempo total fica próximo do check mais lento, não da soma. As linhas
+    saem na ordem em que cada check termina.
+    """
     print(f"\n{BOLD}Apogee – Environment Check{RESET}\n")
 
     results: dict[str, bool] = {}
     start = time.monotonic()
 
-    for name, fn in CHECKS:
-        try:
-            results[name] = fn()
-        except Exception as exc:
-            _fail(name, f"erro inesperado: {exc}")
-            results[name] = False
+    with ThreadPoolExecutor(max_workers=len(CHECKS), thread_name_prefix="check") as executor:
+        futures = {executor.submit(_run_check, name, fn): name for name, fn in CHECKS}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
 
     elapsed = time.monotonic() - start
     passed = sum(results.values())
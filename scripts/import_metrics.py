@@ -16,20 +16,20 @@ Colunas obrigatórias no CSV:
 
 from __future__ import annotations
 
-import csv
+import io
 import logging
-import os
 import sys
 from pathlib import Path
 
 # Adiciona raiz do projeto ao sys.path (2 níveis acima de scripts/)
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import pandas as pd
 from dotenv import load_dotenv
 
 load_dotenv()
 
-import psycopg2
+from scripts._db import connection, get_pool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,45 +40,91 @@ log = logging.getLogger(__name__)
 
 EXPECTED_COLUMNS = {"video_id", "date", "views", "avg_view_duration_sec", "ctr", "likes", "shares"}
 
-# SQL: upsert com detecção de INSERT vs UPDATE via xmax
-UPSERT_SQL = """
-INSERT INTO performance_daily (
-    video_id,
-    report_date,
-    views,
-    avg_view_duration_sec,
-    ctr,
-    likes,
-    shares
-)
-VALUES (
-    %(video_id)s,
-    %(report_date)s,
-    %(views)s,
-    %(avg_view_duration_sec)s,
-    %(ctr)s,
-    %(likes)s,
-    %(shares)s
-)
-ON CONFLICT (video_id, report_date) DO UPDATE SET
-    views                 = EXCLUDED.views,
-    avg_view_duration_sec = EXCLUDED.avg_view_duration_sec,
-    ctr                   = EXCLUDED.ctr,
-    likes                 = EXCLUDED.likes,
-    shares                = EXCLUDED.shares
-RETURNING (xmax = 0) AS inserted;
+INT_COLUMNS = ("views", "likes", "shares")
+
+# Staging temporária: as linhas válidas do CSV entram via COPY (protocolo de
+# cópia do libpq) e o upsert vira um único INSERT ... SELECT no servidor.
+STAGE_SQL = """
+CREATE TEMP TABLE perf_stage (
+    row_no                integer,
+    youtube_video_id      text,
+    report_date           date,
+    views                 integer,
+    avg_view_duration_sec float8,
+    ctr                   float8,
+    likes                 integer,
+    shares                integer
+) ON COMMIT DROP;
 """
 
-LOOKUP_SQL = "SELECT id FROM videos WHERE youtube_video_id = %s LIMIT 1;"
+# Mesma ordem de colunas que parse_frame() + to_csv(index=True) produzem
+COPY_SQL = """
+COPY perf_stage (
+    row_no, youtube_video_id, report_date, views, avg_view_duration_sec, ctr, likes, shares
+) FROM STDIN WITH (FORMAT csv)
+"""
 
+# youtube_video_id sem vídeo correspondente (e quantas linhas cada um tinha)
+MISSING_SQL = """
+SELECT s.youtube_video_id, COUNT(*)
+FROM   perf_stage s
+WHERE  NOT EXISTS (SELECT 1 FROM videos v WHERE v.youtube_video_id = s.youtube_video_id)
+GROUP  BY s.youtube_video_id
+ORDER  BY s.youtube_video_id;
+"""
 
-def _get_db_url() -> str:
-    """Lê SUPABASE_DB_URL do ambiente e falha com mensagem clara se ausente."""
-    url = os.getenv("SUPABASE_DB_URL")
-    if not url:
-        log.error("Variável de ambiente SUPABASE_DB_URL não definida.")
-        sys.exit(1)
-    return url
+# SQL: upsert a partir da staging, resolvendo youtube_video_id -> UUID no JOIN.
+# DISTINCT ON: uma linha por (video_id, report_date) — o ON CONFLICT não aceita
+# a mesma chave duas vezes no statement; a última linha do CSV vence.
+# O WHERE do DO UPDATE pula linhas idênticas às já gravadas: reimportar o mesmo
+# CSV não gera tuplas mortas, WAL nem atualização de índice.
+# Retorna uma linha: vídeos/datas encontrados, inseridos e atualizados
+# (INSERT vs UPDATE via xmax); a diferença são as linhas sem alteração.
+UPSERT_SQL = """
+WITH src AS (
+    SELECT DISTINCT ON (v.id, s.report_date)
+        v.id AS video_id,
+        s.report_date,
+        s.views,
+        s.avg_view_duration_sec,
+        s.ctr,
+        s.likes,
+        s.shares
+    FROM  perf_stage s
+    JOIN  videos v ON v.youtube_video_id = s.youtube_video_id
+    ORDER BY v.id, s.report_date, s.row_no DESC
+),
+upserted AS (
+    INSERT INTO performance_daily (
+        video_id,
+        report_date,
+        views,
+        avg_view_duration_sec,
+        ctr,
+        likes,
+        shares
+    )
+    SELECT video_id, report_date, views, avg_view_duration_sec, ctr, likes, shares
+    FROM   src
+    ON CONFLICT (video_id, report_date) DO UPDATE SET
+        views                 = EXCLUDED.views,
+        avg_view_duration_sec = EXCLUDED.avg_view_duration_sec,
+        ctr                   = EXCLUDED.ctr,
+        likes                 = EXCLUDED.likes,
+        shares                = EXCLUDED.shares
+    WHERE (performance_daily.views, performance_daily.avg_view_duration_sec,
+           performance_daily.ctr, performance_daily.likes, performance_daily.shares)
+          IS DISTINCT FROM
+          (EXCLUDED.views, EXCLUDED.avg_view_duration_sec,
+           EXCLUDED.ctr, EXCLUDED.likes, EXCLUDED.shares)
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    (SELECT COUNT(*) FROM src)            AS matched,
+    COUNT(*) FILTER (WHERE inserted)      AS inserted,
+    COUNT(*) FILTER (WHERE NOT inserted)  AS updated
+FROM upserted;
+"""
 
 
 def validate_columns(fieldnames: list[str] | None) -> None:
@@ -105,34 +151,65 @@ def validate_columns(fieldnames: list[str] | None) -> None:
         sys.exit(1)
 
 
-def parse_row(row: dict) -> dict | None:
-    """Converte e valida os valores de uma linha do CSV.
+def _to_number(col: pd.Series) -> pd.Series:
+    return pd.to_numeric(col.str.strip(), errors="coerce")
+
+
+def _to_count(col: pd.Series) -> pd.Series:
+    num = _to_number(col)
+    return num.where(num % 1 == 0)  # "12.5" não é contagem válida
+
+
+def _to_date(col: pd.Series) -> pd.Series:
+    # Como o cast ::date do Postgres: aceita variantes ISO (20240105, com hora,
+    # com fuso) e fica só com a data do calendário, sem converter fuso
+    day = col.str.strip().str.replace(r"[T ].*$", "", regex=True)
+    return pd.to_datetime(day, format="ISO8601", errors="coerce")
+
+
+def parse_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte e valida todas as linhas do CSV de uma vez (vetorizado, em C).
+
+    Linhas com qualquer valor ausente ou inválido são logadas e descartadas.
+
+    Args:
+        df: CSV lido com dtype=str (valores ainda como texto).
 
     Returns:
-        Dicionário com valores tipados, ou None se a linha for inválida.
+        DataFrame só com as linhas válidas, colunas tipadas e nomeadas como em
+        performance_daily (na ordem de COPY_SQL). O índice é a posição da linha
+        no CSV.
     """
-    try:
-        return {
-            "youtube_video_id": row["video_id"].strip(),
-            "report_date": row["date"].strip(),
-            "views": int(row["views"]),
-            "avg_view_duration_sec": float(row["avg_view_duration_sec"]),
-            "ctr": float(row["ctr"]),
-            "likes": int(row["likes"]),
-            "shares": int(row["shares"]),
+    out = pd.DataFrame(
+        {
+            "youtube_video_id": df["video_id"].str.strip(),
+            # Validada aqui: uma data inválida no COPY abortaria a importação inteira
+            "report_date": _to_date(df["date"]),
+            "views": _to_count(df["views"]),
+            "avg_view_duration_sec": _to_number(df["avg_view_duration_sec"]),
+            "ctr": _to_number(df["ctr"]),
+            "likes": _to_count(df["likes"]),
+            "shares": _to_count(df["shares"]),
         }
-    except (ValueError, KeyError) as exc:
-        log.warning("Linha inválida (erro de conversão): %s — %s", dict(row), exc)
-        return None
+    )
+
+    invalid = out.isna().any(axis=1)
+    for idx in df.index[invalid]:
+        log.warning("Linha inválida (erro de conversão): %s", df.loc[idx].to_dict())
+
+    return out[~invalid].astype({col: "int64" for col in INT_COLUMNS})
 
 
 def import_metrics(file_path: str) -> None:
     """Importa métricas do CSV para a tabela performance_daily.
 
-    Para cada linha do CSV:
-    1. Resolve youtube_video_id -> UUID interno em videos
-    2. Faz upsert em performance_daily
-    3. Contabiliza inserções, atualizações e erros
+    1. Lê e valida todas as linhas do CSV (pandas, vetorizado)
+    2. Envia as linhas válidas para uma tabela temporária via COPY
+    3. Faz o upsert em performance_daily com um único INSERT ... SELECT,
+       resolvendo youtube_video_id -> UUID interno via JOIN com videos
+    4. Contabiliza inserções, atualizações, linhas sem alteração e erros
+
+    Tudo roda em uma transação: ou a importação entra inteira, ou nada entra.
 
     Args:
         file_path: Caminho para o arquivo CSV do YouTube Studio.
@@ -145,112 +222,66 @@ def import_metrics(file_path: str) -> None:
         log.error("Caminho não é um arquivo: %s", file_path)
         sys.exit(1)
 
-    db_url = _get_db_url()
+    error_count = 0
+
+    log.info("Lendo CSV: %s", csv_path)
 
-    log.info("Conectando ao banco de dados...")
     try:
-        conn = psycopg2.connect(db_url, connect_timeout=10)
-    except Exception as exc:
-        log.error("Falha ao conectar ao banco: %s", exc)
+        # dtype=str + keep_default_na=False: só o parser em C, conversões em parse_frame
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    except pd.errors.EmptyDataError:
+        validate_columns(None)
+    except (OSError, UnicodeDecodeError, pd.errors.ParserError) as exc:
+        log.error("Erro inesperado ao processar CSV: %s", exc)
         sys.exit(1)
 
-    # autocommit=True para que cada upsert seja independente;
-    # erros em uma linha não afetam as demais.
-    conn.autocommit = True
+    df.columns = df.columns.str.strip()
+    validate_columns(list(df.columns))
 
-    inserted_count = 0
-    updated_count = 0
-    error_count = 0
-    total_rows = 0
+    total_rows = len(df)
+    parsed = parse_frame(df)
+    error_count += total_rows - len(parsed)
 
-    log.info("Lendo CSV: %s", csv_path)
+    # CSV gerado pelo pandas (em C) alimenta o COPY direto, sem tupla por linha
+    copy_buf = io.StringIO()
+    parsed.to_csv(copy_buf, header=False, index=True, date_format="%Y-%m-%d")
 
+    log.info("Conectando ao banco de dados...")
     try:
-        with csv_path.open(newline="", encoding="utf-8-sig") as fh:
-            reader = csv.DictReader(fh)
-            validate_columns(reader.fieldnames)
-
-            for row in reader:
-                total_rows += 1
-
-                parsed = parse_row(row)
-                if parsed is None:
-                    error_count += 1
-                    continue
-
-                youtube_video_id = parsed["youtube_video_id"]
-
-                # Lookup: youtube_video_id -> UUID interno
-                try:
-                    with conn.cursor() as cur:
-                        cur.execute(LOOKUP_SQL, (youtube_video_id,))
-                        result = cur.fetchone()
-                except Exception as exc:
-                    log.warning(
-                        "Erro ao buscar video_id para %s: %s",
-                        youtube_video_id,
-                        exc,
-                    )
-                    error_count += 1
-                    continue
-
-                if result is None:
-                    log.warning(
-                        "youtube_video_id '%s' não encontrado na tabela videos — linha ignorada.",
-                        youtube_video_id,
-                    )
-                    error_count += 1
-                    continue
-
-                internal_video_id = result[0]
-
-                # Upsert em performance_daily
-                upsert_params = {
-                    "video_id": internal_video_id,
-                    "report_date": parsed["report_date"],
-                    "views": parsed["views"],
-                    "avg_view_duration_sec": parsed["avg_view_duration_sec"],
-                    "ctr": parsed["ctr"],
-                    "likes": parsed["likes"],
-                    "shares": parsed["shares"],
-                }
-
-                try:
-                    with conn.cursor() as cur:
-                        cur.execute(UPSERT_SQL, upsert_params)
-                        upsert_result = cur.fetchone()
-                        was_inserted = upsert_result[0] if upsert_result else True
-                except Exception as exc:
-                    log.warning(
-                        "Erro ao fazer upsert para video %s / data %s: %s",
-                        youtube_video_id,
-                        parsed["report_date"],
-                        exc,
-                    )
-                    error_count += 1
-                    continue
-
-                if was_inserted:
-                    inserted_count += 1
-                    log.debug(
-                        "INSERIDO: %s / %s",
-                        youtube_video_id,
-                        parsed["report_date"],
-                    )
-                else:
-                    updated_count += 1
-                    log.debug(
-                        "ATUALIZADO: %s / %s",
-                        youtube_video_id,
-                        parsed["report_date"],
-                    )
+        get_pool()
+    except Exception as exc:
+        log.error("Falha ao conectar ao banco: %s", exc)
+        sys.exit(1)
 
+    # O with do pool faz commit ao sair, ou rollback (nada gravado) em erro
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(STAGE_SQL)
+            with cur.copy(COPY_SQL) as copy:
+                copy.write(copy_buf.getvalue())
+
+            cur.execute(MISSING_SQL)
+            missing_rows = 0
+            for youtube_video_id, n_rows in cur.fetchall():
+                log.warning(
+                    "youtube_video_id '%s' não encontrado na tabela videos — "
+                    "%d linha(s) ignorada(s).",
+                    youtube_video_id,
+                    n_rows,
+                )
+                missing_rows += n_rows
+            error_count += missing_rows
+
+            cur.execute(UPSERT_SQL)
+            matched, inserted_count, updated_count = cur.fetchone()
     except Exception as exc:
-        log.error("Erro inesperado ao processar CSV: %s", exc)
-        conn.close()
+        log.error("Erro ao importar métricas (nada foi gravado): %s", exc)
         sys.exit(1)
-    finally:
-        conn.close()
+
+    unchanged_count = matched - inserted_count - updated_count
+    # Linhas repetidas de um mesmo (vídeo, data) colapsam no DISTINCT ON:
+    # contam como atualização, como no upsert linha a linha.
+    updated_count += len(parsed) - missing_rows - matched
 
     # Resumo final
     print(
@@ -258,6 +289,7 @@ def import_metrics(file_path: str) -> None:
         f"Total de linhas no CSV : {total_rows}\n"
         f"Linhas importadas      : {inserted_count}\n"
         f"Linhas atualizadas     : {updated_count}\n"
+        f"Linhas sem alteracao   : {unchanged_count}\n"
         f"Erros                  : {error_count}\n"
         f"----------------------------"
     )
@@ -1,6 +1,7 @@
 """
 Prepara assets de áudio para o Remotion Studio:
-  - Copia mp3s de output/audio/{video_id}/ → remotion/public/audio/{video_id}/
+  - Linka (hardlink; cópia se em outro filesystem) mp3s de
+    output/audio/{video_id}/ → remotion/public/audio/{video_id}/
   - Escreve remotion/public/input_props.json com o storyboard do vídeo
   - Imprime o comando de preview
 
@@ -9,15 +10,31 @@ Uso:
 """
 
 import argparse
-import json
+import mmap
+import os
 import shutil
 import sys
 from pathlib import Path
 
+import orjson
+
 ROOT = Path(__file__).parent.parent
 REMOTION_PUBLIC = ROOT / "remotion" / "public"
 
 
+def _load_json_mmap(path: Path):
+    """Faz o parse do JSON direto do arquivo mapeado em memória (sem cópia em bytes/str)."""
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b"")  # mmap não aceita arquivo vazio; orjson dá o erro certo
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()  # o mmap só fecha sem exports ativos
+
+
 def main():
     parser = argparse.ArgumentParser(description="Prepara assets Remotion para preview")
     parser.add_argument("--video-id", required=True, help="UUID do vídeo")
@@ -41,23 +58,31 @@ def main():
     audio_dst = REMOTION_PUBLIC / "audio" / video_id
     audio_dst.mkdir(parents=True, exist_ok=True)
 
-    # Copia mp3s
-    mp3_files = list(audio_src.glob("*.mp3"))
+    # Linka mp3s
+    with os.scandir(audio_src) as entries:
+        mp3_files = [e for e in entries if e.name.endswith(".mp3") and e.is_file()]
     if not mp3_files:
         print(f"ERRO: nenhum .mp3 encontrado em {audio_src}", file=sys.stderr)
         sys.exit(1)
 
     for mp3 in mp3_files:
-        shutil.copy2(mp3, audio_dst / mp3.name)
+        dst = audio_dst / mp3.name
+        dst.unlink(missing_ok=True)
+        try:
+            # Hardlink: nenhum byte copiado quando origem e destino estão no mesmo filesystem
+            os.link(mp3.path, dst)
+        except OSError:
+            shutil.copy2(mp3.path, dst)  # filesystems diferentes (ou sem suporte a link)
 
-    print(f"✓ {len(mp3_files)} arquivo(s) copiado(s) → {audio_dst}")
+    print(f"✓ {len(mp3_files)} arquivo(s) linkado(s) → {audio_dst}")
 
     # Escreve input_props.json no formato esperado pelo Remotion (--props / calculateMetadata)
     # Shape: { storyboard: {...}, showTimer: true }
-    storyboard = json.loads(storyboard_path.read_text())
+    # orjson: parse/dump em C, direto de/para bytes UTF-8 (sem escapes, como ensure_ascii=False)
+    storyboard = _load_json_mmap(storyboard_path)
     input_props = {"storyboard": storyboard, "showTimer": True}
     input_props_path = REMOTION_PUBLIC / "input_props.json"
-    input_props_path.write_text(json.dumps(input_props, ensure_ascii=False, indent=2))
+    input_props_path.write_bytes(orjson.dumps(input_props, option=orjson.OPT_INDENT_2))
     print(f"✓ input_props.json escrito → {input_props_path}")
 
     print()
@@ -2,6 +2,7 @@
 
 Idempotente: usa ON CONFLICT DO NOTHING baseado no channel_name.
 Requer que as migrations já tenham sido aplicadas.
+Os dados do canal ficam em scripts/_seeds.py.
 
 Uso:
     uv run python scripts/seed_channel.py
@@ -10,12 +11,17 @@ Uso:
 from __future__ import annotations
 
 import logging
-import os
 import sys
+from pathlib import Path
+
+# Adiciona raiz do projeto ao sys.path (2 níveis acima de scripts/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import psycopg2
 from dotenv import load_dotenv
 
+from scripts._db import connection, get_pool
+from scripts._seeds import insert_channel
+
 load_dotenv()
 
 logging.basicConfig(
@@ -25,62 +31,22 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-# ── Dados do canal ────────────────────────────────────────────
-CHANNEL_DATA = {
-    "channel_name": "Apogee Engine",
-    "niche": "tecnologia e inteligência artificial",
-    "tone": "educativo-direto",
-    "target_audience": (
-        "Profissionais e entusiastas de tecnologia, 25–40 anos, "
-        "interessados em IA aplicada, automação e produtividade"
-    ),
-    "language": "pt-BR",
-    "weekly_target": 2,
-    "youtube_channel_id": None,  # preencher após criar o canal no YouTube
-}
-
-INSERT_SQL = """
-INSERT INTO channel_config (
-    channel_name, niche, tone, target_audience,
-    language, weekly_target, youtube_channel_id
-)
-VALUES (
-    %(channel_name)s, %(niche)s, %(tone)s, %(target_audience)s,
-    %(language)s, %(weekly_target)s, %(youtube_channel_id)s
-)
-ON CONFLICT (channel_name) DO NOTHING
-RETURNING id;
-"""
-
 
 def seed_channel() -> None:
     """Insere o canal padrão em channel_config (idempotente)."""
-    db_url = os.getenv("SUPABASE_DB_URL")
-    if not db_url:
-        log.error("SUPABASE_DB_URL não definido no .env")
-        sys.exit(1)
-
     try:
-        conn = psycopg2.connect(db_url, connect_timeout=10)
+        get_pool()
     except Exception as exc:
         log.error("Falha ao conectar: %s", exc)
         sys.exit(1)
 
+    # O with do pool faz commit ao sair, ou rollback se o INSERT falhar
     try:
-        with conn.cursor() as cur:
-            cur.execute(INSERT_SQL, CHANNEL_DATA)
-            row = cur.fetchone()
-            if row:
-                log.info("Canal inserido com id=%s", row[0])
-            else:
-                log.info("Canal '%s' já existe — nada inserido.", CHANNEL_DATA["channel_name"])
-        conn.commit()
+        with connection() as conn:
+            insert_channel(conn)
     except Exception as exc:
-        conn.rollback()
         log.error("Falha ao inserir canal: %s", exc)
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 """scripts/smoke_test.py — E0.4: Smoke test end-to-end com Supabase real.
 
-Executa 6 passos sequenciais, sem mocks, e limpa tudo ao final.
+Executa 4 passos sequenciais, sem mocks, e limpa tudo ao final.
 
 Uso:
     uv run python scripts/smoke_test.py
@@ -16,15 +16,19 @@ from uuid import uuid4
 # Garante que a raiz do projeto está em sys.path quando executado como script
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import psycopg2
-import psycopg2.extras
+import psycopg
 from dotenv import load_dotenv
+from psycopg.types.json import Jsonb
+from pydantic import TypeAdapter
 
 from models import Claim, Script, ScriptBeat, VideoSpec
+from scripts._db import connection, get_pool
 
 load_dotenv()
 
-TOTAL = 6
+TOTAL = 4
+# Serializer/validator do VideoSpec montados uma vez, no import
+_VIDEO_SPEC = TypeAdapter(VideoSpec)
 _ids: dict[str, str] = {}  # channel_id, topic_id, video_id
 
 
@@ -33,13 +37,13 @@ def fail(step: int, err: Exception | str) -> None:
     sys.exit(1)
 
 
-def cleanup(conn: psycopg2.extensions.connection) -> None:
-    """Remove dados de teste em ordem reversa de FK."""
+def cleanup(conn: psycopg.Connection, cur: psycopg.Cursor) -> None:
+    """Remove dados de teste em ordem reversa de FK (DELETEs em pipeline)."""
     vid = _ids.get("video_id")
     tid = _ids.get("topic_id")
     cid = _ids.get("channel_id")
     try:
-        with conn.cursor() as cur:
+        with conn.pipeline():
             if vid:
                 cur.execute("DELETE FROM claims   WHERE video_id = %s", (vid,))
                 cur.execute("DELETE FROM scripts  WHERE video_id = %s", (vid,))
@@ -57,21 +61,27 @@ def cleanup(conn: psycopg2.extensions.connection) -> None:
 
 
 def main() -> None:
-    db_url = os.getenv("SUPABASE_DB_URL")
-    if not db_url:
+    if not os.getenv("SUPABASE_DB_URL"):
         print("SMOKE TEST FAILED — passo 0: SUPABASE_DB_URL não definido no .env")
         sys.exit(1)
 
     try:
-        conn = psycopg2.connect(db_url, connect_timeout=10)
+        get_pool()
     except Exception as exc:
         print(f"SMOKE TEST FAILED — passo 0: falha ao conectar ao banco: {exc}")
         sys.exit(1)
 
-    conn.autocommit = False
+    # Um único cursor para a execução inteira (passos + cleanup)
+    with connection() as conn, conn.cursor() as cur:
+        _run_steps(conn, cur)
 
+    print("SMOKE TEST PASSED")
+
+
+def _run_steps(conn: psycopg.Connection, cur: psycopg.Cursor) -> None:
+    """Executa os passos do smoke test; os dados de teste são removidos ao final."""
     try:
-        # ── [1/6] Validar VideoSpec ────────────────────────────────────────────
+        # ── [1/4] Validar VideoSpec ────────────────────────────────────────────
         print(f"[1/{TOTAL}] Validando VideoSpec com dados fake")
         try:
             spec = VideoSpec(
@@ -110,11 +120,11 @@ def main() -> None:
             fail(1, exc)
             return
 
-        # ── [2/6] Serializar e deserializar ───────────────────────────────────
+        # ── [2/4] Serializar e deserializar ───────────────────────────────────
         print(f"[2/{TOTAL}] Serializando para JSON e deserializando")
         try:
-            raw = spec.model_dump_json()
-            spec2 = VideoSpec.model_validate_json(raw)
+            raw = _VIDEO_SPEC.dump_json(spec)
+            spec2 = _VIDEO_SPEC.validate_json(raw)
             assert spec2.topic_title == spec.topic_title, "topic_title divergiu"
             assert spec2.script.hook == spec.script.hook, "hook divergiu"
             assert spec2.script.full_text == spec.script.full_text, "full_text divergiu"
@@ -123,76 +133,48 @@ def main() -> None:
             fail(2, exc)
             return
 
-        # ── [3/6] Inserir topic ───────────────────────────────────────────────
-        print(f"[3/{TOTAL}] Inserindo topic em Supabase")
+        # ── [3/4] Inserir channel_config, topic, video, script e claims ───────
+        print(f"[3/{TOTAL}] Inserindo channel_config, topic, video, script e claims em Supabase")
+        # IDs gerados no cliente: nenhum statement depende do RETURNING de outro,
+        # então todos (e o COMMIT) vão juntos em pipeline — 1 round-trip
+        _ids["channel_id"] = str(uuid4())
+        _ids["topic_id"] = str(uuid4())
+        _ids["video_id"] = str(uuid4())
         try:
-            with conn.cursor() as cur:
-                # channel_config necessário como FK
-                cur.execute(
-                    """
-                    INSERT INTO channel_config
-                        (channel_name, niche, tone, target_audience, language, weekly_target)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (
-                        f"Smoke Test Channel {uuid4().hex[:8]}",
-                        "teste-automatizado",
-                        "educativo-direto",
-                        "Desenvolvedores e QA engineers",
-                        "pt-BR",
-                        1,
-                    ),
-                )
-                _ids["channel_id"] = str(cur.fetchone()[0])
-
+            db_rows = spec.to_db_rows()
+            with conn.pipeline():
+                # Cadeia de FKs em um único statement
                 cur.execute(
                     """
-                    INSERT INTO topics (channel_id, title, rationale, status)
-                    VALUES (%s, %s, %s, 'pending')
-                    RETURNING id
+                    WITH c AS (
+                        INSERT INTO channel_config
+                            (id, channel_name, niche, tone, target_audience, language,
+                             weekly_target)
+                        VALUES (%(channel_id)s, %(channel_name)s, %(niche)s, %(tone)s,
+                                %(target_audience)s, %(language)s, %(weekly_target)s)
+                        RETURNING id
+                    ), t AS (
+                        INSERT INTO topics (id, channel_id, title, rationale, status)
+                        SELECT %(topic_id)s, id, %(title)s, %(rationale)s, 'pending' FROM c
+                        RETURNING id, channel_id
+                    )
+                    INSERT INTO videos (id, channel_id, topic_id, title, status)
+                    SELECT %(video_id)s, channel_id, id, %(title)s, 'draft' FROM t
                     """,
-                    (
-                        _ids["channel_id"],
-                        spec.topic_title,
-                        "Gerado pelo smoke test E0.4",
-                    ),
+                    {
+                        "channel_id": _ids["channel_id"],
+                        "topic_id": _ids["topic_id"],
+                        "video_id": _ids["video_id"],
+                        "channel_name": f"Smoke Test Channel {uuid4().hex[:8]}",
+                        "niche": "teste-automatizado",
+                        "tone": "educativo-direto",
+                        "target_audience": "Desenvolvedores e QA engineers",
+                        "language": "pt-BR",
+                        "weekly_target": 1,
+                        "title": spec.topic_title,
+                        "rationale": "Gerado pelo smoke test E0.4",
+                    },
                 )
-                _ids["topic_id"] = str(cur.fetchone()[0])
-            conn.commit()
-        except Exception as exc:
-            conn.rollback()
-            fail(3, exc)
-            return
-
-        # ── [4/6] Inserir video ───────────────────────────────────────────────
-        print(f"[4/{TOTAL}] Inserindo video em Supabase")
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO videos (channel_id, topic_id, title, status)
-                    VALUES (%s, %s, %s, 'draft')
-                    RETURNING id
-                    """,
-                    (
-                        _ids["channel_id"],
-                        _ids["topic_id"],
-                        spec.topic_title,
-                    ),
-                )
-                _ids["video_id"] = str(cur.fetchone()[0])
-            conn.commit()
-        except Exception as exc:
-            conn.rollback()
-            fail(4, exc)
-            return
-
-        # ── [5/6] Inserir script e claims ─────────────────────────────────────
-        print(f"[5/{TOTAL}] Inserindo script e claims em Supabase")
-        try:
-            db_rows = spec.to_db_rows()
-            with conn.cursor() as cur:
                 cur.execute(
                     """
                     INSERT INTO scripts
@@ -202,53 +184,59 @@ def main() -> None:
                     (
                         _ids["video_id"],
                         db_rows["scripts"]["hook"],
-                        psycopg2.extras.Json(db_rows["scripts"]["beats"]),
+                        Jsonb(db_rows["scripts"]["beats"]),
                         db_rows["scripts"]["payoff"],
                         db_rows["scripts"]["cta"],
                         db_rows["scripts"]["template_score"],
                         db_rows["scripts"]["version"],
                     ),
                 )
-                for claim_row in db_rows["claims"]:
+                # Todas as claims em um único INSERT multi-VALUES (1 parse/plan);
+                # COPY não é suportado em pipeline mode
+                claim_values = [
+                    (
+                        _ids["video_id"],
+                        claim_row["claim_text"],
+                        claim_row["source_url"],
+                        claim_row["verified"],
+                        claim_row["risk_score"],
+                    )
+                    for claim_row in db_rows["claims"]
+                ]
+                if claim_values:
                     cur.execute(
-                        """
-                        INSERT INTO claims
-                            (video_id, claim_text, source_url, verified, risk_score)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """,
-                        (
-                            _ids["video_id"],
-                            claim_row["claim_text"],
-                            claim_row["source_url"],
-                            claim_row["verified"],
-                            claim_row["risk_score"],
-                        ),
+                        "INSERT INTO claims"
+                        " (video_id, claim_text, source_url, verified, risk_score) VALUES "
+                        + ", ".join(["(%s, %s, %s, %s, %s)"] * len(claim_values)),
+                        [value for row in claim_values for value in row],
                     )
-            conn.commit()
+                conn.commit()
         except Exception as exc:
             conn.rollback()
-            fail(5, exc)
+            fail(3, exc)
             return
 
-        # ── [6/6] Recuperar e comparar ────────────────────────────────────────
-        print(f"[6/{TOTAL}] Recuperando do banco e comparando topic_title, script.hook, claims[0].confidence")
+        # ── [4/4] Recuperar e comparar ────────────────────────────────────────
+        print(
+            f"[4/{TOTAL}] Recuperando do banco e comparando "
+            "topic_title, script.hook, claims[0].confidence"
+        )
         try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT v.title, s.hook, c.risk_score
-                    FROM   videos   v
-                    JOIN   scripts  s ON s.video_id = v.id
-                    JOIN   claims   c ON c.video_id = v.id
-                    WHERE  v.id = %s
-                    LIMIT  1
-                    """,
-                    (_ids["video_id"],),
-                )
-                row = cur.fetchone()
+            # Três point-selects por PK/FK (sem JOIN) em um único round-trip
+            cur.execute(
+                """
+                SELECT (SELECT title      FROM videos  WHERE id       = %(vid)s),
+                       (SELECT hook       FROM scripts WHERE video_id = %(vid)s LIMIT 1),
+                       (SELECT risk_score FROM claims  WHERE video_id = %(vid)s LIMIT 1)
+                """,
+                {"vid": _ids["video_id"]},
+            )
+            db_title, db_hook, db_risk_score = cur.fetchone()
 
-            assert row is not None, "linha não encontrada no banco após inserção"
-            db_title, db_hook, db_risk_score = row
+            assert None not in (db_title, db_hook, db_risk_score), (
+                "linha não encontrada no banco após inserção "
+                f"(title={db_title!r}, hook={db_hook!r}, risk_score={db_risk_score!r})"
+            )
 
             assert db_title == spec.topic_title, (
                 f"topic_title: esperado {spec.topic_title!r}, obtido {db_title!r}"
@@ -263,14 +251,11 @@ def main() -> None:
                 f"reconstruído {reconstructed} (risk_score={db_risk_score})"
             )
         except Exception as exc:
-            fail(6, exc)
+            fail(4, exc)
             return
 
     finally:
-        cleanup(conn)
-        conn.close()
-
-    print("SMOKE TEST PASSED")
+        cleanup(conn, cur)
 
 
 if __name__ == "__main__":
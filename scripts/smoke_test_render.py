@@ -12,103 +12,337 @@ Valida:
 Uso:
     uv run python scripts/smoke_test_render.py
     uv run python scripts/smoke_test_render.py --video-id <UUID>
+    uv run python scripts/smoke_test_render.py --recompute-lufs
+    uv run python scripts/smoke_test_render.py --render-cache  # reusa MP4 de script idêntico
+    uv run python scripts/smoke_test_render.py --render-cache --video-id <UUID>  # já renderizado
+    uv run python scripts/smoke_test_render.py --skip-tts --skip-render  # só postprocess
+
+Com --render-cache, um cache hit não roda o postprocess e portanto não grava
+renders nem muda videos.status: o passo 6 pula essas checagens e valida só o
+MP4 em cache (tamanho + LUFS medido via ffmpeg). Sem --video-id só vídeos
+com status='scripted' são escolhidos.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import hashlib
+import importlib
 import json
 import os
+import shutil
 import subprocess
 import sys
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
 from uuid import UUID
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 ROOT = Path(__file__).parent.parent
+FINAL_DIR = ROOT / "output" / "final"
+# MP4 final por hash do conteúdo do script: re-smoke do mesmo roteiro pula TTS/render
+RENDER_CACHE_DIR = ROOT / "output" / "cache"
 TOTAL = 6
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 4
+LUFS_TAIL_LINES = 200  # linhas finais do stderr do ffmpeg mantidas para achar o JSON
+
+_pool: psycopg2.pool.ThreadedConnectionPool | None = None
+
+
+def _get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    """Cria (no primeiro uso) o pool de conexões do smoke test."""
+    global _pool
+    if _pool is None:
+        db_url = os.getenv("SUPABASE_DB_URL")
+        if not db_url:
+            raise RuntimeError("SUPABASE_DB_URL não definido no .env")
+        _pool = psycopg2.pool.ThreadedConnectionPool(
+            POOL_MIN_SIZE, POOL_MAX_SIZE, db_url, connect_timeout=10
+        )
+    return _pool
 
 
-def _get_conn() -> psycopg2.extensions.connection:
-    db_url = os.getenv("SUPABASE_DB_URL")
-    if not db_url:
-        raise RuntimeError("SUPABASE_DB_URL não definido no .env")
-    return psycopg2.connect(db_url, connect_timeout=10)
-
-
-def _find_scripted_video(conn: psycopg2.extensions.connection, video_id: str | None) -> tuple[UUID, str]:
-    with conn.cursor() as cur:
-        if video_id:
-            cur.execute(
-                """
-                SELECT v.id, t.title FROM videos v
-                JOIN topics t ON t.id = v.topic_id
-                WHERE v.id = %s
-                """,
-                (video_id,),
-            )
-        else:
-            cur.execute(
-                """
-                SELECT v.id, t.title FROM videos v
-                JOIN topics t ON t.id = v.topic_id
-                WHERE v.status = 'scripted'
-                ORDER BY v.updated_at DESC LIMIT 1
-                """
-            )
-        row = cur.fetchone()
+@contextmanager
+def _get_conn() -> Iterator[psycopg2.extensions.connection]:
+    """Empresta uma conexão do pool e a devolve ao sair do with.
+
+    Os passos de TTS/render levam minutos: a conexão não fica presa ao
+    main() nesse intervalo, e o passo 6 reaproveita a mesma sessão do pool
+    (sem novo handshake TLS/auth).
+    """
+    pool = _get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        conn.rollback()  # só leituras: devolve a sessão ao pool fora de transação
+        pool.putconn(conn)
+
+
+def _find_scripted_video(
+    cur: psycopg2.extensions.cursor, video_id: str | None
+) -> tuple[UUID, str]:
+    if video_id:
+        cur.execute(
+            """
+            SELECT v.id, t.title FROM videos v
+            JOIN topics t ON t.id = v.topic_id
+            WHERE v.id = %s
+            """,
+            (video_id,),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT v.id, t.title FROM videos v
+            JOIN topics t ON t.id = v.topic_id
+            WHERE v.status = 'scripted'
+            ORDER BY v.updated_at DESC LIMIT 1
+            """
+        )
+    row = cur.fetchone()
     if not row:
         raise RuntimeError("Nenhum vídeo com status='scripted' encontrado.")
     return UUID(str(row[0])), str(row[1])
 
 
+def _extract_last_json(text: str) -> str | None:
+    """Retorna o último bloco {...} balanceado de `text`, ou None.
+
+    Uma única varredura de trás para frente: acha o último "}" e casa o "{"
+    correspondente por contagem de profundidade.
+    """
+    end = text.rfind("}")
+    if end == -1:
+        return None
+    depth = 0
+    for i in range(end, -1, -1):
+        c = text[i]
+        if c == "}":
+            depth += 1
+        elif c == "{":
+            depth -= 1
+            if depth == 0:
+                return text[i : end + 1]
+    return None
+
+
 def _measure_lufs(video_path: Path) -> float:
-    """Mede o LUFS integrado do arquivo via ffmpeg loudnorm."""
-    result = subprocess.run(
+    """Mede o LUFS integrado do arquivo via ffmpeg loudnorm.
+
+    O stderr do ffmpeg é lido em streaming e só as últimas LUFS_TAIL_LINES
+    linhas ficam em memória — o bloco JSON do loudnorm vem no final.
+    """
+    proc = subprocess.Popen(
         [
             "ffmpeg", "-i", str(video_path),
             "-af", "loudnorm=print_format=json",
             "-f", "null", "-",
         ],
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         text=True,
     )
     # loudnorm imprime JSON no stderr
-    stderr = result.stderr
-    start = stderr.rfind("{")
-    end = stderr.rfind("}") + 1
-    if start == -1 or end == 0:
+    tail: deque[str] = deque(proc.stderr, maxlen=LUFS_TAIL_LINES)
+    proc.wait()
+    block = _extract_last_json("".join(tail))
+    if block is None:
         raise RuntimeError("ffmpeg loudnorm não retornou JSON esperado")
-    data = json.loads(stderr[start:end])
+    data = json.loads(block)
     return float(data["input_i"])
 
 
-def _fetch_render_record(conn: psycopg2.extensions.connection, video_id: UUID) -> dict:
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute(
-            """
-            SELECT file_path, duration_secs, file_size_bytes, lufs, render_time_sec
-            FROM renders WHERE video_id = %s
-            ORDER BY created_at DESC LIMIT 1
-            """,
-            (str(video_id),),
-        )
-        row = cur.fetchone()
+def _fetch_render_record(cur: psycopg2.extras.RealDictCursor, video_id: UUID) -> dict:
+    cur.execute(
+        """
+        SELECT file_path, duration_secs, file_size_bytes, lufs, render_time_sec
+        FROM renders WHERE video_id = %s
+        ORDER BY created_at DESC LIMIT 1
+        """,
+        (str(video_id),),
+    )
+    row = cur.fetchone()
     if not row:
         raise RuntimeError("Registro em renders não encontrado após render")
     return dict(row)
 
 
+def _script_hash(cur: psycopg2.extensions.cursor, video_id: UUID) -> str | None:
+    """blake2b(128 bits) de (hook, beats, payoff, cta) do script mais recente do vídeo."""
+    cur.execute(
+        """
+        SELECT hook, beats, payoff, cta FROM scripts
+        WHERE video_id = %s
+        ORDER BY created_at DESC LIMIT 1
+        """,
+        (str(video_id),),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    payload = json.dumps(list(row), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _use_cached_render(cached_mp4: Path, video_id: UUID) -> Path:
+    """Aponta output/final/{video_id}.mp4 (symlink) para o MP4 em cache."""
+    final_path = FINAL_DIR / f"{video_id}.mp4"
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    final_path.unlink(missing_ok=True)
+    final_path.symlink_to(cached_mp4.resolve())
+    return final_path
+
+
+def _store_render(final_path: Path, cached_mp4: Path) -> None:
+    """Guarda uma cópia do MP4 final no cache.
+
+    Cópia (não link): um re-render posterior que sobrescreva o final in-place
+    não pode corromper a entrada do cache.
+    """
+    cached_mp4.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(final_path, cached_mp4)
+
+
+def _agent(module: str, func: str) -> Callable[..., Any]:
+    """Importa o agente só quando o passo roda (passos pulados não pagam o import)."""
+    return getattr(importlib.import_module(module), func)
+
+
+def _run_media_steps(video_id: UUID, skip_tts: bool = False, skip_render: bool = False) -> Path:
+    """Passos 2-5: TTS → Storyboard → Render → Postprocess. Retorna o MP4 final.
+
+    skip_tts/skip_render reaproveitam o áudio / o MP4 do Remotion já em output/.
+    """
+    # ── [2/6] TTS ─────────────────────────────────────────────────────────────
+    if skip_tts:
+        print(f"[2/{TOTAL}] TTS pulado (--skip-tts): usando áudio existente")
+    else:
+        print(f"[2/{TOTAL}] Gerando áudio TTS (Edge-TTS pt-BR-AntonioNeural)")
+        generate_audio_async = _agent("agents.tts", "generate_audio_async")
+        durations = asyncio.run(generate_audio_async(video_id))
+        assert durations, "generate_audio retornou dict vazio"
+        total_dur = sum(durations.values())
+        print(f"         {len(durations)} segmentos | {total_dur:.1f}s total")
+
+    # ── [3/6] Storyboard ──────────────────────────────────────────────────────
+    print(f"[3/{TOTAL}] Montando storyboard com timestamps reais")
+    build_storyboard = _agent("agents.storyboard_director", "build_storyboard")
+    storyboard = build_storyboard(video_id)
+    scenes = storyboard.get("scenes", [])
+    assert len(scenes) >= 3, f"Esperado >= 3 cenas, obtido {len(scenes)}"
+    print(f"         {len(scenes)} cenas | duração total: {storyboard['total_duration']:.1f}s")
+
+    # ── [4/6] Render Remotion ─────────────────────────────────────────────────
+    if skip_render:
+        print(f"[4/{TOTAL}] Render pulado (--skip-render): usando MP4 do Remotion existente")
+    else:
+        print(f"[4/{TOTAL}] Renderizando vídeo via Remotion (npx remotion render)…")
+        render_video = _agent("agents.render", "render_video")
+        render_result = render_video(video_id)
+        output_mp4 = Path(render_result["output_path"])
+        assert output_mp4.exists(), f"MP4 não encontrado: {output_mp4}"
+        assert output_mp4.stat().st_size > 100_000, "MP4 suspeito: < 100 KB"
+        print(f"         {render_result['file_size_mb']} MB | {render_result['render_time_sec']}s")
+
+    # ── [5/6] Postprocess FFmpeg ──────────────────────────────────────────────
+    print(f"[5/{TOTAL}] Aplicando loudnorm -14 LUFS + H.264 CRF 23 + thumbnail")
+    postprocess = _agent("agents.postprocess", "postprocess")
+    final_path_str = postprocess(video_id)
+    final_path = Path(final_path_str)
+    assert final_path.exists(), f"Arquivo final não encontrado: {final_path}"
+    assert final_path.stat().st_size > 100_000, "Arquivo final < 100 KB"
+
+    # Thumbnail
+    thumbnail = final_path.parent.parent / "thumbnails" / f"{video_id}.jpg"
+    # Tenta caminhos alternativos
+    if not thumbnail.exists():
+        thumbnail = ROOT / "output" / "thumbnails" / f"{video_id}.jpg"
+    assert thumbnail.exists(), f"Thumbnail não encontrada: {thumbnail}"
+    print(f"         Final: {final_path.name} | Thumbnail: {thumbnail.name}")
+    return final_path
+
+
+def _check_lufs(lufs_val: float, label: str) -> None:
+    assert -16.0 <= lufs_val <= -12.0, \
+        f"LUFS fora do range esperado: {lufs_val} (esperado entre -16 e -12)"
+    print(f"         {label}: {lufs_val:.1f} ✓")
+
+
+def _validate_cached_render(final_path: Path) -> None:
+    """Passo 6 num cache hit: nada foi renderizado, então renders/videos.status não mudam."""
+    print(f"[6/{TOTAL}] Cache hit — pulando checagens de renders e video.status")
+    assert final_path.stat().st_size > 100_000, "MP4 em cache < 100 KB"
+    _check_lufs(_measure_lufs(final_path), "LUFS (medido no MP4 em cache)")
+
+
+def _validate_render_records(video_id: UUID, final_path: Path, recompute_lufs: bool) -> None:
+    print(f"[6/{TOTAL}] Validando registros no banco (renders, lufs, video status)")
+    # Uma conexão e um único RealDictCursor para as duas leituras
+    with (
+        _get_conn() as conn,
+        conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur,
+    ):
+        render_rec = _fetch_render_record(cur, video_id)
+        cur.execute("SELECT status FROM videos WHERE id = %s", (str(video_id),))
+        status = cur.fetchone()["status"]
+    assert render_rec["duration_secs"] and render_rec["duration_secs"] > 0, \
+        "renders.duration_secs inválido"
+    assert render_rec["render_time_sec"] and render_rec["render_time_sec"] > 0, \
+        "renders.render_time_sec inválido"
+
+    # Verifica LUFS: renders.lufs (gravado pelo postprocess) ou, com
+    # --recompute-lufs, uma nova medição (decode completo do MP4 final)
+    if recompute_lufs:
+        _check_lufs(_measure_lufs(final_path), "LUFS")
+    elif render_rec.get("lufs") is not None:
+        _check_lufs(float(render_rec["lufs"]), "LUFS")
+
+    # Verifica status do vídeo
+    assert status == "published" or status in ("rendered",), \
+        f"video.status inesperado: {status}"
+    print(f"         video.status = '{status}' ✓")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Smoke test render end-to-end")
     parser.add_argument("--video-id", metavar="UUID", help="UUID do vídeo (opcional)")
+    parser.add_argument(
+        "--recompute-lufs",
+        action="store_true",
+        help="Remede o LUFS do MP4 final via ffmpeg em vez de confiar em renders.lufs",
+    )
+    parser.add_argument(
+        "--render-cache",
+        action="store_true",
+        help=(
+            "Reaproveita o MP4 final em output/cache/ quando o conteúdo do script não mudou "
+            "(pula TTS/storyboard/render/postprocess e as checagens de renders/video.status)"
+        ),
+    )
+    parser.add_argument(
+        "--skip-tts",
+        action="store_true",
+        help="Pula o TTS e reaproveita o áudio já gerado em output/audio/",
+    )
+    parser.add_argument(
+        "--skip-render",
+        action="store_true",
+        help="Pula o render Remotion e reaproveita o MP4 já renderizado",
+    )
     args = parser.parse_args()
 
     db_url = os.getenv("SUPABASE_DB_URL")
@@ -116,84 +350,45 @@ def main() -> None:
         print("SMOKE TEST RENDER FAILED — SUPABASE_DB_URL não definido")
         sys.exit(1)
 
-    conn = _get_conn()
     video_id: UUID | None = None
 
     try:
         # ── [1/6] Encontrar vídeo scripted ────────────────────────────────────
         print(f"[1/{TOTAL}] Buscando vídeo com status='scripted'")
-        video_id, title = _find_scripted_video(conn, args.video_id)
+        with _get_conn() as conn, conn.cursor() as cur:
+            video_id, title = _find_scripted_video(cur, args.video_id)
+            script_hash = _script_hash(cur, video_id) if args.render_cache else None
         print(f"         Vídeo: [{str(video_id)[:8]}] {title}")
 
-        # ── [2/6] TTS ─────────────────────────────────────────────────────────
-        print(f"[2/{TOTAL}] Gerando áudio TTS (Edge-TTS pt-BR-AntonioNeural)")
-        from agents.tts import generate_audio
-        durations = generate_audio(video_id)
-        assert durations, "generate_audio retornou dict vazio"
-        total_dur = sum(durations.values())
-        print(f"         {len(durations)} segmentos | {total_dur:.1f}s total")
-
-        # ── [3/6] Storyboard ──────────────────────────────────────────────────
-        print(f"[3/{TOTAL}] Montando storyboard com timestamps reais")
-        from agents.storyboard_director import build_storyboard
-        storyboard = build_storyboard(video_id)
-        scenes = storyboard.get("scenes", [])
-        assert len(scenes) >= 3, f"Esperado >= 3 cenas, obtido {len(scenes)}"
-        print(f"         {len(scenes)} cenas | duração total: {storyboard['total_duration']:.1f}s")
-
-        # ── [4/6] Render Remotion ─────────────────────────────────────────────
-        print(f"[4/{TOTAL}] Renderizando vídeo via Remotion (npx remotion render)…")
-        from agents.render import render_video
-        render_result = render_video(video_id)
-        output_mp4 = Path(render_result["output_path"])
-        assert output_mp4.exists(), f"MP4 não encontrado: {output_mp4}"
-        assert output_mp4.stat().st_size > 100_000, "MP4 suspeito: < 100 KB"
-        print(f"         {render_result['file_size_mb']} MB | {render_result['render_time_sec']}s")
-
-        # ── [5/6] Postprocess FFmpeg ──────────────────────────────────────────
-        print(f"[5/{TOTAL}] Aplicando loudnorm -14 LUFS + H.264 CRF 23 + thumbnail")
-        from agents.postprocess import postprocess
-        final_path_str = postprocess(video_id)
-        final_path = Path(final_path_str)
-        assert final_path.exists(), f"Arquivo final não encontrado: {final_path}"
-        assert final_path.stat().st_size > 100_000, "Arquivo final < 100 KB"
-
-        # Thumbnail
-        thumbnail = final_path.parent.parent / "thumbnails" / f"{video_id}.jpg"
-        # Tenta caminhos alternativos
-        if not thumbnail.exists():
-            thumbnail = ROOT / "output" / "thumbnails" / f"{video_id}.jpg"
-        assert thumbnail.exists(), f"Thumbnail não encontrada: {thumbnail}"
-        print(f"         Final: {final_path.name} | Thumbnail: {thumbnail.name}")
-
-        # ── [6/6] Validar registros no DB ─────────────────────────────────────
-        print(f"[6/{TOTAL}] Validando registros no banco (renders, lufs, video status)")
-        render_rec = _fetch_render_record(conn, video_id)
-        assert render_rec["duration_secs"] and render_rec["duration_secs"] > 0, \
-            "renders.duration_secs inválido"
-        assert render_rec["render_time_sec"] and render_rec["render_time_sec"] > 0, \
-            "renders.render_time_sec inválido"
-
-        # Verifica LUFS se o campo estiver preenchido
-        if render_rec.get("lufs") is not None:
-            lufs_val = float(render_rec["lufs"])
-            assert -16.0 <= lufs_val <= -12.0, \
-                f"LUFS fora do range esperado: {lufs_val} (esperado entre -16 e -12)"
-            print(f"         LUFS: {lufs_val:.1f} ✓")
-
-        # Verifica status do vídeo
-        with conn.cursor() as cur:
-            cur.execute("SELECT status FROM videos WHERE id = %s", (str(video_id),))
-            status = cur.fetchone()[0]
-        assert status == "published" or status in ("rendered",), \
-            f"video.status inesperado: {status}"
-        print(f"         video.status = '{status}' ✓")
+        # ── [2-5/6] Mídia (ou MP4 em cache para o mesmo conteúdo de script) ────
+        cached_mp4: Path | None = None
+        if script_hash:
+            cached_mp4 = RENDER_CACHE_DIR / f"{script_hash}.mp4"
+        cache_hit = cached_mp4 is not None and cached_mp4.exists()
+        if cache_hit:
+            final_path = _use_cached_render(cached_mp4, video_id)
+            print(f"[2-5/{TOTAL}] Cache hit ({cached_mp4.name}) — pulando TTS/storyboard/render")
+        else:
+            # Symlink de um cache hit anterior: o postprocess escreveria através dele
+            stale_link = FINAL_DIR / f"{video_id}.mp4"
+            if stale_link.is_symlink():
+                stale_link.unlink()
+            final_path = _run_media_steps(video_id, args.skip_tts, args.skip_render)
+            if cached_mp4 is not None:
+                _store_render(final_path, cached_mp4)
+
+        # ── [6/6] Validar registros no DB (ou só o MP4, num cache hit) ────────
+        if cache_hit:
+            _validate_cached_render(final_path)
+        else:
+            _validate_render_records(video_id, final_path, args.recompute_lufs)
 
     except Exception as exc:
         print(f"\nSMOKE TEST RENDER FAILED: {exc}")
         sys.exit(1)
     finally:
-        conn.close()
+        if _pool is not None:
+            _pool.closeall()
 
     print(f"\n{'─' * 60}")
     print("SMOKE TEST RENDER PASSED")
@@ -9,6 +9,9 @@
 #
 # Cada worker roda em background. O script aguarda até que todos terminem
 # (ou até Ctrl+C, que envia SIGINT para os processos filhos).
+#
+# Os workers sobem via workers.dispatcher, que importa o agente da fila antes
+# de começar a consumir: cada job roda num fork com os módulos já carregados.
 
 set -euo pipefail
 cd "$(dirname "$0")/.."
@@ -17,19 +20,19 @@ echo "Iniciando workers Apogee..."
 echo "  REDIS_URL=${REDIS_URL:-redis://localhost:6379}"
 echo ""
 
-uv run rq worker topic_miner  &
+uv run python -m workers.dispatcher topic_miner &
 PID_MINER=$!
 echo "  [topic_miner]  PID=$PID_MINER"
 
-uv run rq worker researcher  &
+uv run python -m workers.dispatcher researcher &
 PID_RESEARCHER=$!
 echo "  [researcher]   PID=$PID_RESEARCHER"
 
-uv run rq worker scriptwriter  &
+uv run python -m workers.dispatcher scriptwriter &
 PID_SCRIPT=$!
 echo "  [scriptwriter] PID=$PID_SCRIPT"
 
-uv run rq worker fact_checker  &
+uv run python -m workers.dispatcher fact_checker &
 PID_FACT=$!
 echo "  [fact_checker] PID=$PID_FACT"
 
@@ -11,6 +11,7 @@ Uso:
 
 from __future__ import annotations
 
+import mmap
 import sys
 import time
 from pathlib import Path
@@ -40,6 +41,43 @@ AGENTS: dict[str, str] = {
 # Modelo mais barato para verificação (não gera custo significativo)
 _VERIFY_MODEL = "claude-haiku-4-5-20251001"
 
+# Espera antes de cada tentativa de read_run (backoff exponencial, ~15.75s no total).
+# A maioria dos runs é indexada em < 500ms: o caminho feliz termina nas primeiras.
+_READ_RUN_BACKOFF_S = (0.25, 0.5, 1, 2, 4, 8)
+
+# Batch ingest do client: até 100 runs / 20 MB por POST, no máximo 8 threads de envio.
+# Sobrescreve só estes limites na config devolvida pelo servidor (GET /info); o
+# resto (ex.: use_multipart_endpoint) segue o que o servidor anunciar. Inclui
+# todas as chaves que a thread de tracing indexa, para funcionar mesmo quando
+# o servidor não envia batch_ingest_config.
+_BATCH_INGEST_OVERRIDES = {
+    "size_limit": 100,
+    "size_limit_bytes": 20_000_000,
+    "scale_up_qsize_trigger": 200,
+    "scale_up_nthreads_limit": 8,
+    "scale_down_nempty_trigger": 4,
+}
+
+
+def _make_client() -> LangSmithClient:
+    """Client com o /info do servidor e os limites de batch ingest sobrescritos.
+
+    A thread de tracing lê `client.info` assim que o client é criado, então a
+    config precisa entrar no construtor. O /info vem de um client de sondagem
+    sem auto-batch (sem thread de tracing), fechado logo em seguida — custo de
+    um GET /info, o mesmo de um client padrão.
+    """
+    probe = LangSmithClient(auto_batch_tracing=False)
+    try:
+        server_info = probe.info
+    finally:
+        probe.session.close()
+    batch_ingest_config = {**(server_info.batch_ingest_config or {}), **_BATCH_INGEST_OVERRIDES}
+    return LangSmithClient(
+        info=server_info.model_copy(update={"batch_ingest_config": batch_ingest_config})
+    )
+
+
 # ── Verificação 1 — Trace real ─────────────────────────────────────────────────
 
 
@@ -70,7 +108,7 @@ def verify_trace() -> bool:
         return False
 
     # Usa client explícito para poder acessar tracing_queue após o trace
-    ls_client = LangSmithClient()
+    ls_client = _make_client()
     client_ai = anthropic.Anthropic()
 
     run_id: str | None = None
@@ -102,13 +140,12 @@ def verify_trace() -> bool:
     if ls_client.tracing_queue is not None:
         ls_client.tracing_queue.join()
     else:
-        time.sleep(3)
+        time.sleep(0.5)
 
     # Retry com backoff: LangSmith pode ter um delay de indexação após receber o run
     run = None
     last_exc: Exception | None = None
-    for attempt in range(1, 7):          # até ~15s total (1+2+2+2+2+2+3)
-        wait_s = 1 if attempt == 1 else 2
+    for wait_s in _READ_RUN_BACKOFF_S:
         time.sleep(wait_s)
         try:
             run = ls_client.read_run(run_id)
@@ -133,6 +170,15 @@ def verify_trace() -> bool:
 # ── Verificação 2 — Auditoria de agentes ──────────────────────────────────────
 
 
+def _has_traceable(path: Path) -> bool:
+    """Procura b"@traceable" direto nos bytes do arquivo (mmap, sem decodificar)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # mmap não aceita arquivo vazio
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(b"@traceable") != -1
+
+
 def verify_agents() -> bool:
     """Verifica que @traceable está presente em todos os agentes.
 
@@ -151,8 +197,7 @@ def verify_agents() -> bool:
             detail = "(arquivo não encontrado)"
             all_ok = False
         else:
-            text = agent_path.read_text(encoding="utf-8")
-            if "@traceable" in text:
+            if _has_traceable(agent_path):
                 status = "OK     "
                 detail = ""
             else:
@@ -0,0 +1,36 @@
+"""workers/callbacks.py — Callbacks RQ que sinalizam o término de um job.
+
+Ao terminar (sucesso ou falha), o worker faz RPUSH de um token em
+`apogee:done:{job_id}`; o orquestrador bloqueia em BLPOP nessa chave em vez
+de consultar o status do job periodicamente.
+"""
+
+from __future__ import annotations
+
+import json
+
+from redis import Redis
+from rq.job import Job
+
+DONE_KEY_PREFIX = "apogee:done:"
+DONE_KEY_TTL_S = 600  # token expira se ninguém consumir (ex: orquestrador caiu)
+
+
+def done_key(job_id: str) -> str:
+    return f"{DONE_KEY_PREFIX}{job_id}"
+
+
+def _signal_done(job: Job, connection: Redis, status: str) -> None:
+    key = done_key(job.id)
+    pipe = connection.pipeline(transaction=False)
+    pipe.rpush(key, json.dumps({"status": status}))
+    pipe.expire(key, DONE_KEY_TTL_S)
+    pipe.execute()
+
+
+def on_success(job: Job, connection: Redis, result: object, *args, **kwargs) -> None:
+    _signal_done(job, connection, "finished")
+
+
+def on_failure(job: Job, connection: Redis, type, value, traceback) -> None:  # noqa: A002
+    _signal_done(job, connection, "failed")
@@ -0,0 +1,75 @@
+"""workers/dispatcher.py — Ponto de entrada único dos jobs RQ dos agentes.
+
+Os jobs são enfileirados como `workers.dispatcher.run(<agente>, <id>)`; o
+callable do agente é importado na primeira chamada e fica em cache.
+
+Executado como módulo, sobe um worker RQ com os agentes das filas indicadas
+já importados: o work-horse de cada job é um fork do processo principal e
+herda o grafo de módulos (pydantic, anthropic, agents.*) aquecido.
+
+Uso:
+    uv run python -m workers.dispatcher topic_miner researcher
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+from collections.abc import Callable
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# agente (= nome da fila RQ) → (módulo, função)
+_REGISTRY: dict[str, tuple[str, str]] = {
+    "topic_miner": ("agents.topic_miner", "mine_topics"),
+    "researcher": ("agents.researcher", "research_topic"),
+    "scriptwriter": ("agents.scriptwriter", "write_script"),
+    "fact_checker": ("agents.fact_checker", "check_script"),
+}
+
+_resolved: dict[str, Callable[[UUID], object]] = {}
+
+
+def _resolve(name: str) -> Callable[[UUID], object]:
+    """Importa (uma vez por processo) e retorna a função do agente `name`."""
+    func = _resolved.get(name)
+    if func is None:
+        try:
+            module_name, func_name = _REGISTRY[name]
+        except KeyError:
+            raise ValueError(f"Agente desconhecido: {name!r}") from None
+        func = getattr(importlib.import_module(module_name), func_name)
+        _resolved[name] = func
+    return func
+
+
+def _to_jsonable(result: object) -> object:
+    if isinstance(result, BaseModel):
+        return result.model_dump(mode="json", exclude_none=True)
+    if isinstance(result, list):
+        return [_to_jsonable(item) for item in result]
+    return result
+
+
+def run(name: str, entity_id: UUID) -> bytes:
+    """Job RQ: executa o agente `name` e retorna o resultado serializado em JSON (orjson)."""
+    return orjson.dumps(_to_jsonable(_resolve(name)(entity_id)))
+
+
+def main(queue_names: list[str]) -> None:
+    """Pré-importa os agentes das filas e processa jobs até ser interrompido."""
+    from redis import Redis  # noqa: PLC0415
+    from rq import Worker  # noqa: PLC0415
+
+    for name in queue_names:
+        _resolve(name)
+    Worker(queue_names, connection=Redis.from_url(REDIS_URL)).work()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(_REGISTRY))